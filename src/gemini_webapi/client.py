@@ -25,7 +25,7 @@ from .utils import (
     parse_file_name,
     rotate_1psidts,
     get_access_token,
-    load_browser_cookies,
+    load_browser_cookies_async,
     rotate_tasks,
     logger,
 )
@@ -84,7 +84,8 @@ class GeminiClient:
     Async httpx client interface for gemini.google.com.
 
     `secure_1psid` must be provided unless the optional dependency `browser-cookie3` is installed and
-    you have logged in to google.com in your local browser.
+    you have logged in to google.com in your local browser. In that case cookies are loaded from local
+    browser storage in `GeminiClient.init`, not on construction.
 
     Parameters
     ----------
@@ -97,11 +98,6 @@ class GeminiClient:
     kwargs: `dict`, optional
         Additional arguments which will be passed to the http client.
         Refer to `httpx.AsyncClient` for more information.
-
-    Raises
-    ------
-    `ValueError`
-        If `browser-cookie3` is installed but cookies for google.com are not found in your local browser storage.
     """
 
     __slots__ = [
@@ -150,35 +146,6 @@ class GeminiClient:
             self.cookies["__Secure-1PSID"] = secure_1psid
             if secure_1psidts:
                 self.cookies["__Secure-1PSIDTS"] = secure_1psidts
-        elif self.auto_load_cookies:
-            try:
-                loaded_cookies = load_browser_cookies(
-                    domain_name="google.com",
-                    browser_name=self.preferred_browser,
-                    verbose=True,  # Consistent with how load_browser_cookies was implicitly called
-                )
-                if loaded_cookies and loaded_cookies.get("__Secure-1PSID"):
-                    self.cookies = loaded_cookies
-                else:
-                    # This path is taken if auto-loading is on, but __Secure-1PSID isn't found.
-                    # No immediate error, but init() will fail if cookies remain essential and missing.
-                    logger.warning(
-                        f"Attempted to load cookies with browser='{self.preferred_browser if self.preferred_browser else 'any'}' "
-                        "but __Secure-1PSID was not found. Manual cookie provision may be required."
-                    )
-            except ImportError:
-                logger.warning(
-                    "browser-cookie3 is not installed. Cannot automatically load cookies. "
-                    "Please provide cookies manually or install the dependency with: pip install gemini-webapi[browser]"
-                )
-            except Exception as e:
-                logger.error(f"An unexpected error occurred during cookie loading: {e}. Manual cookie provision may be required.")
-        # If secure_1psid was not given, and auto_load_cookies is False, or if auto-loading failed to set self.cookies,
-        # then self.cookies might be empty or lack __Secure-1PSID.
-        # The get_access_token function, called during self.init(), is responsible for
-        # raising an error if essential cookies like __Secure-1PSID are ultimately missing.
-
-    async def init(
 
     async def init(
         self,
@@ -207,9 +174,18 @@ class GeminiClient:
             Time interval for background cookie refresh in seconds. Effective only if `auto_refresh` is `True`.
         verbose: `bool`, optional
             If `True`, will print more infomation in logs.
+
+        Raises
+        ------
+        `gemini_webapi.AuthError`
+            If `secure_1psid` is not provided and cookies for google.com are not found in your local browser storage,
+            or if provided cookies are invalid.
         """
 
         try:
+            if "__Secure-1PSID" not in self.cookies and self.auto_load_cookies:
+                await self.load_cookies()
+
             access_token, valid_cookies = await get_access_token(
                 base_cookies=self.cookies, proxy=self.proxy, verbose=verbose
             )
@@ -248,6 +224,32 @@ class GeminiClient:
             await self.close()
             raise
 
+    async def load_cookies(self) -> None:
+        """
+        Load cookies from local browser storage without blocking the event loop.
+        Requires the optional dependency `browser-cookie3`.
+        """
+
+        try:
+            loaded_cookies = await load_browser_cookies_async(
+                domain_name="google.com",
+                browser_name=self.preferred_browser,
+                verbose=True,
+                required_keys=frozenset({"__Secure-1PSID", "__Secure-1PSIDTS"}),
+            )
+            if loaded_cookies and loaded_cookies.get("__Secure-1PSID"):
+                # Cookies are updated in place later on, e.g. by the auto refresh task
+                self.cookies = dict(loaded_cookies)
+            else:
+                # This path is taken if auto-loading is on, but __Secure-1PSID isn't found.
+                # No immediate error, but init() will fail if cookies remain essential and missing.
+                logger.warning(
+                    f"Attempted to load cookies with browser='{self.preferred_browser if self.preferred_browser else 'any'}' "
+                    "but __Secure-1PSID was not found. Manual cookie provision may be required."
+                )
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during cookie loading: {e}. Manual cookie provision may be required.")
+
     async def close(self, delay: float = 0) -> None:
         """
         Close the client after a certain period of inactivity, or call manually to close immediately.
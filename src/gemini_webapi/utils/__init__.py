@@ -3,7 +3,11 @@ from asyncio import Task
 from .upload_file import upload_file, parse_file_name  # noqa: F401
 from .rotate_1psidts import rotate_1psidts  # noqa: F401
 from .get_access_token import get_access_token  # noqa: F401
-from .load_browser_cookies import load_browser_cookies  # noqa: F401
+from .load_browser_cookies import (  # noqa: F401
+    load_browser_cookies,
+    load_browser_cookies_async,
+    reset_request_cache,
+)
 from .logger import logger, set_log_level  # noqa: F401
 
 
@@ -0,0 +1,103 @@
+import sys
+
+_BLOCK_SIZE = 16
+
+
+def _decrypt_cbc_batch(key: bytes, iv: bytes, ciphertexts: list[bytes]) -> list[bytes | None]:
+    """
+    Decrypt AES-CBC ciphertexts sharing the same key and IV. All blocks are decrypted in a single
+    ECB pass, then each block is XORed with the previous ciphertext block (or IV for the first one),
+    which is exactly what CBC mode does per value.
+
+    Returns `None` in place of values with invalid padding, e.g. if encrypted with another key.
+    """
+
+    from Cryptodome.Cipher import AES
+
+    decrypted = AES.new(key, AES.MODE_ECB).decrypt(b"".join(ciphertexts))
+
+    results = []
+    offset = 0
+    for ciphertext in ciphertexts:
+        size = len(ciphertext)
+        chained = iv + ciphertext[:-_BLOCK_SIZE]
+        plaintext = (
+            int.from_bytes(decrypted[offset : offset + size], "big")
+            ^ int.from_bytes(chained, "big")
+        ).to_bytes(size, "big")
+        offset += size
+
+        padding = plaintext[-1]
+        if 1 <= padding <= _BLOCK_SIZE and plaintext[-padding:] == bytes([padding]) * padding:
+            results.append(plaintext[:-padding])
+        else:
+            results.append(None)
+    return results
+
+
+def decrypt_cookies(
+    browser, rows: list[tuple[str, str, bytes]], has_integrity_check: bool = False
+) -> dict:
+    """
+    Decrypt cookie values of a Chromium based browser read from its database.
+
+    On Linux and macOS, values encrypted with the same key are decrypted together instead of creating
+    a cipher for each of them. Values which cannot be decrypted this way, and all values on Windows,
+    are passed to browser_cookie3's own `_decrypt`.
+
+    Parameters
+    ----------
+    browser : `browser_cookie3.ChromiumBased`
+        Browser instance holding the keys for decryption.
+    rows : list[tuple[str, str, bytes]]
+        Rows of (name, value, encrypted_value) from the `cookies` table.
+    has_integrity_check : bool, optional
+        Whether decrypted values are prefixed with the sha256 of the cookie domain.
+
+    Returns
+    -------
+    `dict`
+        Dictionary with cookie name as key and cookie value as value.
+
+    Raises
+    ------
+    `browser_cookie3.BrowserCookieError`
+        If cookie values cannot be decrypted.
+    """
+
+    if sys.platform == "win32":
+        return {
+            name: browser._decrypt(value, encrypted_value, has_integrity_check)
+            for name, value, encrypted_value in rows
+        }
+
+    # Values prefixed with v11 (Linux only) may also be encrypted with the empty key,
+    # those are left to browser_cookie3 as they fail padding check with the primary key
+    keys = {b"v10": getattr(browser, "v10_key", None), b"v11": getattr(browser, "v11_key", None)}
+    pending = {version: [] for version in keys}
+    for i, (_, value, encrypted_value) in enumerate(rows):
+        version = encrypted_value[:3]
+        size = len(encrypted_value) - 3
+        if not value and keys.get(version) and size and size % _BLOCK_SIZE == 0:
+            pending[version].append(i)
+
+    decrypted = {}
+    for version, indices in pending.items():
+        if indices:
+            plaintexts = _decrypt_cbc_batch(
+                keys[version], browser.iv, [rows[i][2][3:] for i in indices]
+            )
+            decrypted.update(
+                (i, plaintext) for i, plaintext in zip(indices, plaintexts) if plaintext is not None
+            )
+
+    cookies = {}
+    for i, (name, value, encrypted_value) in enumerate(rows):
+        if (plaintext := decrypted.get(i)) is not None:
+            try:
+                cookies[name] = (plaintext[32:] if has_integrity_check else plaintext).decode()
+                continue
+            except UnicodeDecodeError:
+                pass
+        cookies[name] = browser._decrypt(value, encrypted_value, has_integrity_check)
+    return cookies
@@ -1,23 +1,593 @@
+import os
+import sys
+import asyncio
+import glob
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+
 from .logger import logger
-import browser_cookie3 as bc3
-
-BROWSER_MAPPING = {
-    "firefox": bc3.firefox,
-    "chrome": bc3.chrome,
-    "chromium": bc3.chromium,
-    "opera": bc3.opera,
-    "opera_gx": bc3.opera_gx,
-    "brave": bc3.brave,
-    "edge": bc3.edge,
-    "vivaldi": bc3.vivaldi,
-    "safari": bc3.safari,
-    "librewolf": bc3.librewolf,
+from .read_cookie_db import read_cookie_db, read_cookie_dbs, CHROMIUM_BASED, FIREFOX_BASED
+
+_BROWSER_NAMES = (
+    "firefox",
+    "chrome",
+    "chromium",
+    "opera",
+    "opera_gx",
+    "brave",
+    "edge",
+    "vivaldi",
+    "safari",
+    "librewolf",
+)
+_SUPPORTED_BROWSER_NAMES = ", ".join(_BROWSER_NAMES)
+# Other accepted spellings of browser names, after lowercasing and replacing spaces and hyphens with underscores
+_BROWSER_ALIASES = {
+    "msedge": "edge",
+    "microsoft_edge": "edge",
+    "google_chrome": "chrome",
+    "chrome_canary": "chrome",
+    "operagx": "opera_gx",
+}
+
+# Built on first use so that importing the package doesn't require (or pay for) browser_cookie3
+_BROWSER_MAPPING: dict | None = None
+
+# Browsers found to be installed, see `_installed`
+_installed_browsers: set[str] = set()
+
+# Glob patterns of each browser's cookie database, used to detect changes since the last extraction
+_COOKIE_FILE_PATTERNS = {
+    "linux": {
+        "firefox": [
+            "~/.mozilla/firefox/*/cookies.sqlite",
+            "~/snap/firefox/common/.mozilla/firefox/*/cookies.sqlite",
+        ],
+        "chrome": [
+            "~/.config/google-chrome*/*/Cookies",
+            "~/.var/app/com.google.Chrome/config/google-chrome*/*/Cookies",
+        ],
+        "chromium": [
+            "~/.config/chromium/*/Cookies",
+            "~/.var/app/org.chromium.Chromium/config/chromium/*/Cookies",
+        ],
+        "opera": [
+            "~/.config/opera*/Cookies",
+            "~/.var/app/com.opera.Opera/config/opera*/Cookies",
+        ],
+        "brave": [
+            "~/.config/BraveSoftware/Brave-Browser*/*/Cookies",
+            "~/.var/app/com.brave.Browser/config/BraveSoftware/Brave-Browser*/*/Cookies",
+        ],
+        "edge": [
+            "~/.config/microsoft-edge*/*/Cookies",
+            "~/.var/app/com.microsoft.Edge/config/microsoft-edge*/*/Cookies",
+        ],
+        "vivaldi": [
+            "~/.config/vivaldi*/*/Cookies",
+            "~/.var/app/com.vivaldi.Vivaldi/config/vivaldi/*/Cookies",
+        ],
+        "librewolf": [
+            "~/.librewolf/*/cookies.sqlite",
+            "~/snap/librewolf/common/.librewolf/*/cookies.sqlite",
+        ],
+    },
+    "darwin": {
+        "firefox": ["~/Library/Application Support/Firefox/Profiles/*/cookies.sqlite"],
+        "chrome": ["~/Library/Application Support/Google/Chrome*/*/Cookies"],
+        "chromium": ["~/Library/Application Support/Chromium/*/Cookies"],
+        "opera": [
+            "~/Library/Application Support/com.operasoftware.Opera/Cookies",
+            "~/Library/Application Support/com.operasoftware.OperaNext/Cookies",
+            "~/Library/Application Support/com.operasoftware.OperaDeveloper/Cookies",
+        ],
+        "opera_gx": ["~/Library/Application Support/com.operasoftware.OperaGX/Cookies"],
+        "brave": ["~/Library/Application Support/BraveSoftware/Brave-Browser*/*/Cookies"],
+        "edge": ["~/Library/Application Support/Microsoft Edge*/*/Cookies"],
+        "vivaldi": ["~/Library/Application Support/Vivaldi/*/Cookies"],
+        "safari": [
+            "~/Library/Containers/com.apple.Safari/Data/Library/Cookies/Cookies.binarycookies",
+            "~/Library/Cookies/Cookies.binarycookies",
+        ],
+        "librewolf": ["~/Library/Application Support/librewolf/Profiles/*/cookies.sqlite"],
+    },
+    "win32": {
+        "firefox": [
+            "%APPDATA%/Mozilla/Firefox/Profiles/*/cookies.sqlite",
+            "%LOCALAPPDATA%/Mozilla/Firefox/Profiles/*/cookies.sqlite",
+        ],
+        "chrome": [
+            "%LOCALAPPDATA%/Google/Chrome*/User Data/*/Cookies",
+            "%LOCALAPPDATA%/Google/Chrome*/User Data/*/Network/Cookies",
+            "%APPDATA%/Google/Chrome*/User Data/*/Cookies",
+            "%APPDATA%/Google/Chrome*/User Data/*/Network/Cookies",
+        ],
+        "chromium": [
+            "%LOCALAPPDATA%/Chromium/User Data/*/Cookies",
+            "%LOCALAPPDATA%/Chromium/User Data/*/Network/Cookies",
+            "%APPDATA%/Chromium/User Data/*/Cookies",
+            "%APPDATA%/Chromium/User Data/*/Network/Cookies",
+        ],
+        "opera": [
+            "%APPDATA%/Opera Software/Opera */Cookies",
+            "%APPDATA%/Opera Software/Opera */Network/Cookies",
+            "%LOCALAPPDATA%/Opera Software/Opera */Cookies",
+            "%LOCALAPPDATA%/Opera Software/Opera */Network/Cookies",
+        ],
+        "opera_gx": [
+            "%APPDATA%/Opera Software/Opera GX */Cookies",
+            "%APPDATA%/Opera Software/Opera GX */Network/Cookies",
+            "%LOCALAPPDATA%/Opera Software/Opera GX */Cookies",
+            "%LOCALAPPDATA%/Opera Software/Opera GX */Network/Cookies",
+        ],
+        "brave": [
+            "%LOCALAPPDATA%/BraveSoftware/Brave-Browser*/User Data/*/Cookies",
+            "%LOCALAPPDATA%/BraveSoftware/Brave-Browser*/User Data/*/Network/Cookies",
+            "%APPDATA%/BraveSoftware/Brave-Browser*/User Data/*/Cookies",
+            "%APPDATA%/BraveSoftware/Brave-Browser*/User Data/*/Network/Cookies",
+        ],
+        "edge": [
+            "%LOCALAPPDATA%/Microsoft/Edge*/User Data/*/Cookies",
+            "%LOCALAPPDATA%/Microsoft/Edge*/User Data/*/Network/Cookies",
+            "%APPDATA%/Microsoft/Edge*/User Data/*/Cookies",
+            "%APPDATA%/Microsoft/Edge*/User Data/*/Network/Cookies",
+        ],
+        "vivaldi": [
+            "%LOCALAPPDATA%/Vivaldi/User Data/*/Cookies",
+            "%LOCALAPPDATA%/Vivaldi/User Data/*/Network/Cookies",
+            "%APPDATA%/Vivaldi/User Data/*/Cookies",
+            "%APPDATA%/Vivaldi/User Data/*/Network/Cookies",
+        ],
+        "librewolf": [
+            "%APPDATA%/librewolf/Profiles/*/cookies.sqlite",
+            "%LOCALAPPDATA%/librewolf/Profiles/*/cookies.sqlite",
+        ],
+    },
 }
 
-def load_browser_cookies(domain_name: str = "", verbose=True, browser_name: str | None = None) -> dict:
+# Decrypted cookies are only persisted here for loads filtered by cookie names, never all cookies of a browser
+_CACHE_FILE = Path.home() / ".cache" / "gemini_webapi" / "browser_cookies.json"
+_cache_file_lock = threading.Lock()
+# Latest results of batch reads by (browser, domain, cookie names), with the stamp of cookie files they were read at.
+# Loads which are not filtered by cookie names are only memoized here, like `_extract_cookies` does for others
+_batch_results: dict[tuple, tuple[tuple, dict]] = {}
+
+# Results of recent calls, shared by bursts of calls with the same arguments (e.g. many clients initializing at once)
+_RESULT_CACHE_TTL = 5.0
+_result_cache: dict[tuple, tuple[float, dict]] = {}
+# Loads in progress, concurrent calls with the same arguments wait for the result instead of loading again
+_pending_loads: dict[tuple, Future] = {}
+_result_cache_lock = threading.Lock()
+# Results within the current request, only active after `reset_request_cache` is called in the context
+_request_cache: ContextVar[dict[tuple, MappingProxyType] | None] = ContextVar(
+    "_gemini_cookie_request_cache", default=None
+)
+
+
+def _get_mapping() -> dict:
+    """
+    Import browser_cookie3 and build the mapping from browser names to its loading functions
+    on first call. Returns an empty dict if browser_cookie3 is not installed.
+    """
+
+    global _BROWSER_MAPPING
+
+    if _BROWSER_MAPPING is None:
+        try:
+            import browser_cookie3 as bc3
+        except ImportError:
+            logger.warning(
+                "browser-cookie3 is not installed. Cannot load cookies from local browsers. "
+                "Please provide cookies manually or install the dependency with: pip install gemini-webapi[browser]"
+            )
+            return {}
+
+        _BROWSER_MAPPING = {name: getattr(bc3, name) for name in _BROWSER_NAMES}
+        # Further access to the public name no longer goes through module `__getattr__`
+        globals()["BROWSER_MAPPING"] = _BROWSER_MAPPING
+    return _BROWSER_MAPPING
+
+
+def __getattr__(name: str):
+    # `BROWSER_MAPPING` is resolved on first access, so that it's only built when actually needed
+    if name == "BROWSER_MAPPING":
+        return _get_mapping()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _normalize_browser_name(browser_name: str) -> str:
+    name = browser_name.strip().lower().replace(" ", "_").replace("-", "_")
+    return _BROWSER_ALIASES.get(name, name)
+
+
+def _get_platform() -> str:
+    if sys.platform.startswith("linux") or "bsd" in sys.platform.lower():
+        return "linux"
+    return sys.platform
+
+
+def _get_cookie_file_patterns(browser_name: str) -> list[str]:
+    """
+    Return glob patterns of the browser's cookie databases on current platform, in the same locations
+    browser_cookie3 searches.
+    """
+
+    platform = _get_platform()
+    patterns = list(_COOKIE_FILE_PATTERNS.get(platform, {}).get(browser_name, []))
+    if platform == "win32" and browser_name == "chrome":
+        # Private helper of browser_cookie3, pinned to a minor version in dependencies. The user data
+        # directory set by group policy is used instead of the default ones if present
+        from browser_cookie3 import _windows_group_policy_path
+
+        if policy_cookie_file := _windows_group_policy_path():
+            patterns.insert(0, glob.escape(policy_cookie_file).replace("\\", "/"))
+    return patterns
+
+
+def _get_cookie_files(browser_name: str) -> list[str]:
+    """
+    Return paths of the cookie databases found for the browser on current platform.
+    """
+
+    cookie_files = []
+    for pattern in _get_cookie_file_patterns(browser_name):
+        cookie_files.extend(sorted(glob.glob(os.path.expandvars(os.path.expanduser(pattern)))))
+    return cookie_files
+
+
+def _get_profile_dirs(browser_name: str) -> list[str]:
+    """
+    Return paths of the browser's data directories found on current platform, i.e. cookie file
+    patterns cut after their first wildcard component (e.g. `~/.config/google-chrome*`), or the
+    directory of the cookie file if the pattern has no wildcard.
+    """
+
+    profile_dirs = []
+    for pattern in _get_cookie_file_patterns(browser_name):
+        parts = pattern.split("/")
+        for i, part in enumerate(parts):
+            if any(char in part for char in "*?["):
+                root = "/".join(parts[: i + 1])
+                break
+        else:
+            root = "/".join(parts[:-1])
+        profile_dirs.extend(glob.glob(os.path.expandvars(os.path.expanduser(root))))
+    return profile_dirs
+
+
+def _installed(browser_name: str) -> bool:
+    """
+    Whether the browser seems to be installed, i.e. any of its data directories exists, even if
+    browser_cookie3 would find the cookie database elsewhere (e.g. Firefox profiles with absolute
+    paths). Used to skip calling browser_cookie3 for missing browsers when trying all of them.
+
+    Browsers on platforms without known locations, and Safari on macOS whose container may not be
+    accessible, are always assumed to be installed. Positive results are cached for the lifetime of
+    the process, missing browsers are checked again every time so that they're picked up once installed.
+    """
+
+    if browser_name in _installed_browsers:
+        return True
+
+    platform = _get_platform()
+    if (
+        platform not in _COOKIE_FILE_PATTERNS
+        or (platform == "darwin" and browser_name == "safari")
+        or _get_profile_dirs(browser_name)
+    ):
+        _installed_browsers.add(browser_name)
+        return True
+    return False
+
+
+def _get_installed_browsers(mapping: dict) -> tuple[tuple[str, object], ...]:
+    """
+    Return (name, loading function) pairs of the installed browsers, in mapping order.
+    """
+
+    return tuple((name, fn) for name, fn in mapping.items() if _installed(name))
+
+
+def _get_cookie_files_stamp(browser_name: str) -> tuple | None:
+    """
+    Return a hashable stamp of the browser's cookie databases, including their journal and WAL files,
+    and for Firefox based browsers the session store files in the same profile, which changes whenever
+    browser writes to them. Returns `None` if no database is found.
+    """
+
+    stamp = []
+    for cookie_file in _get_cookie_files(browser_name):
+        paths = [cookie_file, f"{cookie_file}-journal", f"{cookie_file}-wal"]
+        if browser_name in FIREFOX_BASED:
+            # Session cookies are read from these files too, same locations as browser_cookie3
+            profile_dir = os.path.dirname(cookie_file)
+            paths.append(os.path.join(profile_dir, "sessionstore.js"))
+            paths.append(os.path.join(profile_dir, "sessionstore-backups", "recovery.jsonlz4"))
+        for path in paths:
+            try:
+                stamp.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                continue
+    return tuple(stamp) or None
+
+
+def _read_cache_file() -> dict:
+    try:
+        return json.loads(_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache_entries(entries: dict) -> None:
+    with _cache_file_lock:
+        cache = _read_cache_file()
+        cache.update(entries)
+        _CACHE_FILE.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # Write to a temporary file (only accessible by current user) first so that a concurrent
+        # reader never sees a partial file
+        fd, temp_path = tempfile.mkstemp(dir=_CACHE_FILE.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(cache, f)
+            os.replace(temp_path, _CACHE_FILE)
+        except OSError:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+
+def _cache_key(browser_name: str, domain_name: str, wanted: frozenset[str] | None) -> str:
+    return f"{browser_name}:{domain_name}:{','.join(sorted(wanted or ()))}"
+
+
+def _is_direct_readable(browser_name: str) -> bool:
+    return (
+        browser_name in CHROMIUM_BASED or browser_name in FIREFOX_BASED
+    ) and bool(_get_cookie_files(browser_name))
+
+
+def _read_cookies(
+    browser_name: str, cookie_fn, domain_name: str, wanted: frozenset[str] | None
+) -> dict:
+    """
+    Collect cookies of the browser, skipping the ones not in `wanted` unless it's empty.
+
+    Databases of Chromium and Firefox based browsers are queried directly when found, otherwise
+    or if the database cannot be read that way, falls back to the browser_cookie3 function.
+    """
+
+    if _is_direct_readable(browser_name):
+        try:
+            return read_cookie_db(browser_name, domain_name, wanted)
+        except sqlite3.Error as e:
+            logger.debug(
+                "Failed to read {} cookie database directly, falling back to browser_cookie3. {}",
+                browser_name,
+                e,
+            )
+
+    if wanted:
+        return {
+            cookie.name: cookie.value
+            for cookie in cookie_fn(domain_name=domain_name)
+            if cookie.name in wanted
+        }
+    return {cookie.name: cookie.value for cookie in cookie_fn(domain_name=domain_name)}
+
+
+@lru_cache(maxsize=32)
+def _extract_cookies(
+    browser_name: str,
+    cookie_fn,
+    domain_name: str,
+    wanted: frozenset[str] | None,
+    stamp: tuple,
+) -> dict:
+    """
+    Load cookies from the browser, reusing the result stored in cache file if cookie databases
+    are unchanged since then. Results are also memoized in process by the same key.
+
+    Only results filtered by cookie names are stored in cache file.
+    """
+
+    if not wanted:
+        return _read_cookies(browser_name, cookie_fn, domain_name, wanted)
+
+    key = _cache_key(browser_name, domain_name, wanted)
+    entry = _read_cache_file().get(key)
+    if entry and tuple(map(tuple, entry["stamp"])) == stamp:
+        return entry["cookies"]
+
+    cookies = _read_cookies(browser_name, cookie_fn, domain_name, wanted)
+    try:
+        _write_cache_entries({key: {"stamp": stamp, "cookies": cookies}})
+    except OSError as e:
+        logger.debug("Failed to write browser cookies to cache file. {}", e)
+    return cookies
+
+
+def _cached_extract(
+    browser_name: str,
+    cookie_fn,
+    domain_name: str,
+    wanted: frozenset[str] | None = None,
+) -> dict:
+    """
+    Load cookies from the browser through the cache layer. Set environment variable
+    `GEMINI_COOKIE_CACHE=0` to always read from browser directly.
+
+    The returned dict may be shared with cache and must not be modified.
+    """
+
+    if os.getenv("GEMINI_COOKIE_CACHE") != "0" and (
+        stamp := _get_cookie_files_stamp(browser_name)
+    ):
+        return _extract_cookies(browser_name, cookie_fn, domain_name, wanted, stamp)
+
+    return _read_cookies(browser_name, cookie_fn, domain_name, wanted)
+
+
+def _read_direct_batch(
+    browser_names: tuple[str, ...], domain_name: str, wanted: frozenset[str] | None
+) -> dict:
+    """
+    Read cookie databases of the browsers together with `read_cookie_dbs`. Results are reused for
+    databases unchanged since the last read in this process, or since they were stored in cache file
+    if filtered by cookie names. Browsers which cannot be read this way are left out of the result,
+    to be loaded one by one with `_cached_extract`.
+
+    The returned dicts may be shared with cache and must not be modified.
+    """
+
+    results = {}
+    stamps = {}
+    if os.getenv("GEMINI_COOKIE_CACHE") != "0":
+        cache = _read_cache_file() if wanted else {}
+        for browser_name in browser_names:
+            if stamp := _get_cookie_files_stamp(browser_name):
+                stamps[browser_name] = stamp
+                memo = _batch_results.get((browser_name, domain_name, wanted))
+                if memo and memo[0] == stamp:
+                    results[browser_name] = memo[1]
+                    continue
+                entry = cache.get(_cache_key(browser_name, domain_name, wanted))
+                if entry and tuple(map(tuple, entry["stamp"])) == stamp:
+                    results[browser_name] = entry["cookies"]
+                    _batch_results[(browser_name, domain_name, wanted)] = (stamp, entry["cookies"])
+
+    if to_read := tuple(name for name in browser_names if name not in results):
+        try:
+            loaded = read_cookie_dbs(to_read, domain_name, wanted)
+        except sqlite3.Error as e:
+            logger.debug(
+                "Failed to read cookie databases of {} in batch, reading them one by one. {}",
+                ", ".join(to_read),
+                e,
+            )
+            return results
+
+        results.update(loaded)
+        for browser_name, cookies in loaded.items():
+            if browser_name in stamps and isinstance(cookies, dict):
+                _batch_results[(browser_name, domain_name, wanted)] = (stamps[browser_name], cookies)
+        if not wanted:
+            return results
+
+        entries = {
+            _cache_key(browser_name, domain_name, wanted): {
+                "stamp": stamps[browser_name],
+                "cookies": cookies,
+            }
+            for browser_name, cookies in loaded.items()
+            if browser_name in stamps and isinstance(cookies, dict)
+        }
+        if entries:
+            try:
+                _write_cache_entries(entries)
+            except OSError as e:
+                logger.debug("Failed to write browser cookies to cache file. {}", e)
+    return results
+
+
+def _result_cache_key(
+    domain_name: str,
+    browser_name: str | None,
+    required_keys: frozenset[str] | None,
+    cookie_name_filter: frozenset[str] | None,
+) -> tuple:
+    return (
+        domain_name,
+        browser_name and _normalize_browser_name(browser_name),
+        frozenset(required_keys or ()),
+        frozenset(cookie_name_filter or ()),
+    )
+
+
+def _get_cached_result(key: tuple) -> dict | None:
+    entry = _result_cache.get(key)
+    if entry and time.monotonic() - entry[0] < _RESULT_CACHE_TTL:
+        return entry[1]
+    return None
+
+
+def _prune_result_cache(now: float) -> None:
+    # Drop expired results so that cache doesn't grow with every set of arguments ever used
+    expired = [key for key, (loaded_at, _) in _result_cache.items() if now - loaded_at >= _RESULT_CACHE_TTL]
+    for key in expired:
+        del _result_cache[key]
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _claim_load(key: tuple) -> tuple[Future, bool]:
+    """
+    Return a future of the result for the key, and whether the caller is responsible for loading it.
+    The future is already done if there is a recent result in cache.
+    """
+
+    with _result_cache_lock:
+        if (cookies := _get_cached_result(key)) is not None:
+            future = Future()
+            future.set_result(cookies)
+            return future, False
+
+        if future := _pending_loads.get(key):
+            return future, False
+
+        future = _pending_loads[key] = Future()
+        return future, True
+
+
+def _release_load(key: tuple, future: Future, cookies: dict | None) -> None:
+    """
+    Publish the result of a claimed load to cache and waiting callers. `None` means loading failed,
+    in which case waiting callers will try to load again by themselves.
+    """
+
+    with _result_cache_lock:
+        del _pending_loads[key]
+        now = time.monotonic()
+        _prune_result_cache(now)
+        if cookies is not None:
+            _result_cache[key] = (now, cookies)
+    future.set_result(cookies)
+
+
+def reset_request_cache() -> None:
+    """
+    Start a new per-request cookie cache in the current context. Within it, repeated calls of
+    `load_browser_cookies` and `load_browser_cookies_async` with the same arguments return the first
+    result, regardless of `_RESULT_CACHE_TTL`. Meant to be called by server middlewares at the start
+    of each request, as ASGI servers run every request in its own context.
+    """
+
+    _request_cache.set({})
+
+
+def load_browser_cookies(
+    domain_name: str = "",
+    verbose=True,
+    browser_name: str | None = None,
+    required_keys: frozenset[str] | None = None,
+    cookie_name_filter: frozenset[str] | None = None,
+) -> MappingProxyType:
     """
     Try to load cookies from all supported browsers or a specific browser and return combined cookiejar.
     Optionally pass in a domain name to only load cookies from the specified domain.
+    Results are reused for calls with the same arguments within `_RESULT_CACHE_TTL` seconds.
 
     Parameters
     ----------
@@ -28,60 +598,275 @@ def load_browser_cookies(domain_name: str = "", verbose=True, browser_name: str
     browser_name : str | None, optional
         Specific browser to load cookies from. If None, tries all supported browsers.
         Supported names: "firefox", "chrome", "chromium", "opera", "opera_gx", "brave", "edge", "vivaldi", "safari", "librewolf".
+        Names are case-insensitive, and a few common aliases such as "msedge" or "operagx" are also accepted.
+    required_keys : frozenset[str] | None, optional
+        Names of the cookies needed by caller. If provided, when trying all browsers, the remaining ones
+        will not be waited for once all required cookies are found.
+    cookie_name_filter : frozenset[str] | None, optional
+        Names of the cookies to load, others will be skipped. Defaults to `required_keys` if provided,
+        otherwise all cookies are loaded.
 
     Returns
     -------
-    `dict`
-        Dictionary with cookie name as key and cookie value as value.
+    `MappingProxyType`
+        Read-only mapping with cookie name as key and cookie value as value. The underlying dict may be
+        shared with other callers, use `dict(...)` to get a mutable copy.
     """
 
+    key = _result_cache_key(domain_name, browser_name, required_keys, cookie_name_filter)
+    request_cache = _request_cache.get()
+    if request_cache is not None and key in request_cache:
+        return request_cache[key]
+
+    while True:
+        future, is_owner = _claim_load(key)
+        if not is_owner:
+            if not future.done() and _in_event_loop():
+                # The load may be owned by a coroutine on this event loop, which can't finish while
+                # the loop is blocked waiting for it, so load independently instead
+                cookies = _load_browser_cookies(
+                    domain_name, verbose, browser_name, required_keys, cookie_name_filter
+                )
+                break
+            if (cookies := future.result()) is None:
+                continue
+            break
+
+        cookies = None
+        try:
+            cookies = _load_browser_cookies(
+                domain_name, verbose, browser_name, required_keys, cookie_name_filter
+            )
+        finally:
+            _release_load(key, future, cookies)
+        break
+
+    result = MappingProxyType(cookies)
+    if request_cache is not None:
+        request_cache[key] = result
+    return result
+
+
+def _load_browser_cookies(
+    domain_name: str,
+    verbose: bool,
+    browser_name: str | None,
+    required_keys: frozenset[str] | None,
+    cookie_name_filter: frozenset[str] | None,
+) -> dict:
+    mapping = _get_mapping()
+    if not mapping:
+        return {}
+
+    from browser_cookie3 import BrowserCookieError
+
     cookies = {}
+    wanted = frozenset(cookie_name_filter or required_keys or ())
 
     if browser_name:
-        browser_name_lower = browser_name.lower()
-        if browser_name_lower in BROWSER_MAPPING:
-            cookie_fn = BROWSER_MAPPING[browser_name_lower]
+        normalized_name = _normalize_browser_name(browser_name)
+        if cookie_fn := mapping.get(normalized_name):
             try:
-                for cookie in cookie_fn(domain_name=domain_name):
-                    cookies[cookie.name] = cookie.value
-            except bc3.BrowserCookieError:
+                cookies.update(_cached_extract(normalized_name, cookie_fn, domain_name, wanted))
+            except BrowserCookieError:
                 # This error can be common if the browser is not installed or has no cookies
                 if verbose:
-                    logger.info(f"No cookies found for {browser_name} or browser not installed.")
+                    logger.info("No cookies found for {} or browser not installed.", browser_name)
             except PermissionError as e:
                 if verbose:
                     logger.warning(
-                        f"Permission denied while trying to load cookies from {browser_name}. {e}"
+                        "Permission denied while trying to load cookies from {}. {}", browser_name, e
                     )
             except Exception as e:
                 if verbose:
                     logger.error(
-                        f"Error happened while trying to load cookies from {browser_name}. {e}"
+                        "Error happened while trying to load cookies from {}. {}", browser_name, e
                     )
         else:
             logger.warning(
-                f"Invalid browser name '{browser_name}'. Supported names are: {', '.join(BROWSER_MAPPING.keys())}. "
-                "No cookies will be loaded."
+                "Invalid browser name '{}'. Supported names are: {}. No cookies will be loaded.",
+                browser_name,
+                _SUPPORTED_BROWSER_NAMES,
             )
             return {}  # Return empty cookies as per requirement for invalid browser name
     else:
-        # Original behavior: try all browsers
-        for cookie_fn_name, cookie_fn in BROWSER_MAPPING.items():
-            try:
-                for cookie in cookie_fn(domain_name=domain_name):
-                    cookies[cookie.name] = cookie.value
-            except bc3.BrowserCookieError:
-                # This error is expected if a browser is not installed or has no cookies for the domain
-                pass
-            except PermissionError as e:
-                if verbose:
-                    logger.warning(
-                        f"Permission denied while trying to load cookies from {cookie_fn_name}. {e}"
-                    )
-            except Exception as e:
-                # Catching generic Exception to avoid program crash for unexpected errors from a specific browser
-                if verbose:
-                    logger.error(
-                        f"Error happened while trying to load cookies from {cookie_fn_name}. {e}"
+        # Try all browsers. Extraction is blocking I/O (database copy, keychain decryption), so run
+        # them concurrently, but merge in mapping order so later browsers keep taking precedence
+        if not (installed := _get_installed_browsers(mapping)):
+            return cookies
+
+        direct = tuple(name for name, _ in installed if _is_direct_readable(name))
+        executor = ThreadPoolExecutor(max_workers=len(installed))
+        try:
+            # Browsers only supported by browser_cookie3 are loaded while databases of the others
+            # are read in batch, which leaves out the ones to be loaded separately
+            futures = {
+                cookie_fn_name: executor.submit(
+                    _cached_extract, cookie_fn_name, cookie_fn, domain_name, wanted
+                )
+                for cookie_fn_name, cookie_fn in installed
+                if cookie_fn_name not in direct
+            }
+            batched = _read_direct_batch(direct, domain_name, wanted) if direct else {}
+            for cookie_fn_name, cookie_fn in installed:
+                if cookie_fn_name not in batched and cookie_fn_name not in futures:
+                    futures[cookie_fn_name] = executor.submit(
+                        _cached_extract, cookie_fn_name, cookie_fn, domain_name, wanted
                     )
+
+            for cookie_fn_name, _ in installed:
+                if cookie_fn_name in batched:
+                    result = batched[cookie_fn_name]
+                else:
+                    future = futures[cookie_fn_name]
+                    result = future.exception() or future.result()
+                _merge_result(cookies, cookie_fn_name, result, verbose)
+                if required_keys and required_keys.issubset(cookies):
+                    break
+        finally:
+            # Don't wait for the rest of browsers if required cookies are already found
+            executor.shutdown(wait=False, cancel_futures=True)
+    return cookies
+
+
+async def load_browser_cookies_async(
+    domain_name: str = "",
+    verbose=True,
+    browser_name: str | None = None,
+    required_keys: frozenset[str] | None = None,
+    cookie_name_filter: frozenset[str] | None = None,
+) -> MappingProxyType:
+    """
+    Async version of `load_browser_cookies`. Browsers are read in worker threads so that
+    the event loop is not blocked by the extraction.
+
+    Parameters
+    ----------
+    domain_name : str, optional
+        Domain name to filter cookies by, by default will load all cookies without filtering.
+    verbose : bool, optional
+        If `True`, will print more infomation in logs.
+    browser_name : str | None, optional
+        Specific browser to load cookies from. If None, tries all supported browsers.
+    required_keys : frozenset[str] | None, optional
+        Names of the cookies needed by caller. Refer to `load_browser_cookies` for details.
+    cookie_name_filter : frozenset[str] | None, optional
+        Names of the cookies to load. Refer to `load_browser_cookies` for details.
+
+    Returns
+    -------
+    `MappingProxyType`
+        Read-only mapping with cookie name as key and cookie value as value.
+    """
+
+    key = _result_cache_key(domain_name, browser_name, required_keys, cookie_name_filter)
+    request_cache = _request_cache.get()
+    if request_cache is not None and key in request_cache:
+        return request_cache[key]
+
+    if browser_name:
+        # Worker thread runs in a copy of the context, which shares the same request cache
+        return await asyncio.to_thread(
+            load_browser_cookies,
+            domain_name,
+            verbose,
+            browser_name,
+            required_keys,
+            cookie_name_filter,
+        )
+
+    while True:
+        future, is_owner = _claim_load(key)
+        if not is_owner:
+            # Shielded so that cancelling one waiter doesn't cancel the shared load
+            if (cookies := await asyncio.shield(asyncio.wrap_future(future))) is None:
+                continue
+            break
+
+        cookies = None
+        try:
+            cookies = await _load_browser_cookies_async(
+                domain_name, verbose, required_keys, cookie_name_filter
+            )
+        finally:
+            _release_load(key, future, cookies)
+        break
+
+    result = MappingProxyType(cookies)
+    if request_cache is not None:
+        request_cache[key] = result
+    return result
+
+
+async def _load_browser_cookies_async(
+    domain_name: str,
+    verbose: bool,
+    required_keys: frozenset[str] | None,
+    cookie_name_filter: frozenset[str] | None,
+) -> dict:
+    mapping = _get_mapping()
+    if not mapping:
+        return {}
+
+    cookies = {}
+    wanted = frozenset(cookie_name_filter or required_keys or ())
+    installed = _get_installed_browsers(mapping)
+    direct = tuple(name for name, _ in installed if _is_direct_readable(name))
+
+    def start(cookie_fn_name: str, cookie_fn) -> asyncio.Task:
+        return asyncio.create_task(
+            asyncio.to_thread(_cached_extract, cookie_fn_name, cookie_fn, domain_name, wanted)
+        )
+
+    # Same as `_load_browser_cookies`, databases are read in batch where possible
+    tasks = {name: start(name, fn) for name, fn in installed if name not in direct}
+    try:
+        batched = (
+            await asyncio.to_thread(_read_direct_batch, direct, domain_name, wanted)
+            if direct
+            else {}
+        )
+        for cookie_fn_name, cookie_fn in installed:
+            if cookie_fn_name not in batched and cookie_fn_name not in tasks:
+                tasks[cookie_fn_name] = start(cookie_fn_name, cookie_fn)
+
+        for cookie_fn_name, _ in installed:
+            if cookie_fn_name in batched:
+                result = batched[cookie_fn_name]
+            else:
+                task = tasks[cookie_fn_name]
+                await asyncio.wait([task])
+                result = task.exception() or task.result()
+            _merge_result(cookies, cookie_fn_name, result, verbose)
+            if required_keys and required_keys.issubset(cookies):
+                break
+    finally:
+        for task in tasks.values():
+            task.cancel()
     return cookies
+
+
+def _merge_result(
+    cookies: dict, cookie_fn_name: str, result: dict | BaseException, verbose: bool
+) -> None:
+    """
+    Merge cookies loaded from a browser into the result, or log the error if loading failed.
+    """
+
+    from browser_cookie3 import BrowserCookieError
+
+    if not isinstance(result, BaseException):
+        cookies.update(result)
+    elif isinstance(result, BrowserCookieError):
+        # This error is expected if a browser is not installed or has no cookies for the domain
+        pass
+    elif isinstance(result, PermissionError):
+        if verbose:
+            logger.warning(
+                "Permission denied while trying to load cookies from {}. {}", cookie_fn_name, result
+            )
+    elif verbose:
+        # Catching generic Exception to avoid program crash for unexpected errors from a specific browser
+        logger.error(
+            "Error happened while trying to load cookies from {}. {}", cookie_fn_name, result
+        )
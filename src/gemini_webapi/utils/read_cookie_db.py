@@ -0,0 +1,292 @@
+import http.cookiejar
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .decrypt_cookies import decrypt_cookies
+
+# Browser name -> browser_cookie3 class, used to locate the cookie database and decrypt values
+CHROMIUM_BASED = {
+    "chrome": "Chrome",
+    "chromium": "Chromium",
+    "opera": "Opera",
+    "opera_gx": "OperaGX",
+    "brave": "Brave",
+    "edge": "Edge",
+    "vivaldi": "Vivaldi",
+}
+FIREFOX_BASED = {
+    "firefox": "Firefox",
+    "librewolf": "LibreWolf",
+}
+
+
+def _has_pending_changes(cookie_file: str) -> bool:
+    # A non-empty write-ahead log holds changes not yet checkpointed into the database file, and a
+    # non-empty rollback journal means a transaction is in progress or was interrupted
+    for suffix in ("-wal", "-journal"):
+        journal_file = Path(f"{cookie_file}{suffix}")
+        if journal_file.is_file() and journal_file.stat().st_size:
+            return True
+    return False
+
+
+def _connect(cookie_file: str) -> sqlite3.Connection:
+    """
+    Open the live cookie database in read-only mode, without copying it to a temporary file first.
+
+    If there are no pending changes in the write-ahead log or rollback journal, the database file is
+    opened as immutable, which skips locking and journal handling entirely. Otherwise it's opened
+    normally so that SQLite sees the latest cookies in WAL or rolls back an interrupted transaction,
+    falling back to `nolock` and `immutable` if the browser holds a lock on it.
+    """
+
+    uri = Path(cookie_file).absolute().as_uri()
+    if _has_pending_changes(cookie_file):
+        options = ("?mode=ro", "?mode=ro&nolock=1", "?mode=ro&immutable=1")
+    else:
+        options = ("?mode=ro&immutable=1",)
+
+    for option in options:
+        con = sqlite3.connect(uri + option, uri=True)
+        try:
+            con.execute("PRAGMA query_only = ON")
+            con.execute("SELECT 1 FROM sqlite_master")
+            return con
+        except sqlite3.OperationalError as e:
+            con.close()
+            error = e
+    raise error
+
+
+def _build_select(
+    columns: str, table: str, host_column: str, wanted: frozenset[str] | None
+) -> str:
+    # Same domain matching as browser_cookie3
+    query = f"SELECT {columns} FROM {table} WHERE {host_column} LIKE :domain"
+    if wanted:
+        query += f" AND name IN ({', '.join(f':name{i}' for i in range(len(wanted)))})"
+    return query
+
+
+def _build_params(domain_name: str, wanted: frozenset[str] | None) -> dict[str, str]:
+    return {
+        "domain": f"%{domain_name}%",
+        **{f"name{i}": name for i, name in enumerate(sorted(wanted or ()))},
+    }
+
+
+def _merge_session_cookies(
+    browser, rows: list[tuple[str, str, str, str]], wanted: frozenset[str] | None
+) -> dict:
+    """
+    Build cookies of a Firefox based browser from database rows of (name, value, host, path), merging
+    in session cookies which Firefox keeps in session store files instead of the database. Same as
+    browser_cookie3, session cookies take precedence, and duplicated names resolve in the order
+    cookiejar iterates cookies.
+    """
+
+    jar = http.cookiejar.CookieJar()
+    # Private helpers of browser_cookie3.FirefoxBased, pinned to a minor version in dependencies
+    browser._FirefoxBased__add_session_cookies(jar)
+    browser._FirefoxBased__add_session_cookies_lz4(jar)
+    if not jar:
+        return {name: value for name, value, _, _ in rows}
+
+    cookies = {(host, path, name): value for name, value, host, path in rows}
+    cookies.update(
+        ((cookie.domain, cookie.path, cookie.name), cookie.value)
+        for cookie in jar
+        if not wanted or cookie.name in wanted
+    )
+    return {name: value for (_, _, name), value in sorted(cookies.items())}
+
+
+def _has_integrity_check(con: sqlite3.Connection, schema: str) -> bool:
+    # Same as browser_cookie3's `_has_integrity_check_for_cookie_domain`, for an attached database
+    try:
+        row = con.execute(f"SELECT value FROM {schema}.meta WHERE key = 'version'").fetchone()
+        return bool(row) and int(row[0]) >= 24
+    except (sqlite3.OperationalError, ValueError):
+        return False
+
+
+def read_cookie_db(
+    browser_name: str, domain_name: str = "", wanted: frozenset[str] | None = None
+) -> dict:
+    """
+    Read cookies of a Chromium or Firefox based browser directly from its sqlite database, filtering
+    cookie names in the query. browser_cookie3 is only used to locate the database and decrypt values,
+    and to read session cookies which Firefox keeps outside of the database.
+
+    Parameters
+    ----------
+    browser_name : str
+        Key in `CHROMIUM_BASED` or `FIREFOX_BASED`.
+    domain_name : str, optional
+        Domain name to filter cookies by, by default will load all cookies without filtering.
+    wanted : frozenset[str] | None, optional
+        Names of the cookies to load. If empty, all cookies are loaded.
+
+    Returns
+    -------
+    `dict`
+        Dictionary with cookie name as key and cookie value as value.
+
+    Raises
+    ------
+    `browser_cookie3.BrowserCookieError`
+        If the browser is not installed or cookie values cannot be decrypted.
+    `sqlite3.Error`
+        If the database cannot be read directly, e.g. locked exclusively by the browser.
+    """
+
+    import browser_cookie3 as bc3
+
+    # Ordered the way cookiejar iterates cookies so that duplicated names resolve to the same value
+    if browser_name in CHROMIUM_BASED:
+        browser = getattr(bc3, CHROMIUM_BASED[browser_name])(domain_name=domain_name)
+        query = _build_select("name, value, encrypted_value", "cookies", "host_key", wanted)
+        query += " ORDER BY host_key, path"
+    else:
+        browser = getattr(bc3, FIREFOX_BASED[browser_name])(domain_name=domain_name)
+        query = _build_select("name, value, host, path", "moz_cookies", "host", wanted)
+        query += " ORDER BY host, path"
+
+    con = _connect(browser.cookie_file)
+    try:
+        rows = con.execute(query, _build_params(domain_name, wanted)).fetchall()
+        if browser_name in FIREFOX_BASED:
+            return _merge_session_cookies(browser, rows, wanted)
+
+        has_integrity_check = browser._has_integrity_check_for_cookie_domain(con)
+        return decrypt_cookies(browser, rows, has_integrity_check)
+    finally:
+        con.close()
+
+
+def read_cookie_dbs(
+    browser_names: tuple[str, ...], domain_name: str = "", wanted: frozenset[str] | None = None
+) -> dict:
+    """
+    Read cookies of several Chromium or Firefox based browsers at once. Their databases are attached
+    to a single connection and queried with one `UNION ALL` query per browser family, instead of
+    opening a connection for each of them.
+
+    Only databases without pending changes in the write-ahead log or rollback journal can be attached
+    this way. Browsers whose database has pending changes or cannot be attached are left out of the
+    result, and should be read with `read_cookie_db` instead.
+
+    Parameters
+    ----------
+    browser_names : tuple[str, ...]
+        Keys in `CHROMIUM_BASED` or `FIREFOX_BASED`. At most 10 databases can be attached at once.
+    domain_name : str, optional
+        Domain name to filter cookies by, by default will load all cookies without filtering.
+    wanted : frozenset[str] | None, optional
+        Names of the cookies to load. If empty, all cookies are loaded.
+
+    Returns
+    -------
+    `dict`
+        Dictionary with browser name as key, and as value either a dictionary of its cookies, or the
+        exception raised while loading them, e.g. `browser_cookie3.BrowserCookieError` if the browser
+        is not installed or cookie values cannot be decrypted.
+
+    Raises
+    ------
+    `sqlite3.Error`
+        If the databases cannot be read directly.
+    """
+
+    import browser_cookie3 as bc3
+
+    results = {}
+    browsers = {}
+    # Instantiating a browser locates its database and retrieves the decryption key, e.g. from system
+    # keyring, so do it concurrently for all of them
+    with ThreadPoolExecutor(max_workers=len(browser_names) or 1) as executor:
+        futures = {
+            browser_name: executor.submit(
+                getattr(bc3, CHROMIUM_BASED.get(browser_name) or FIREFOX_BASED[browser_name]),
+                domain_name=domain_name,
+            )
+            for browser_name in browser_names
+        }
+    for browser_name, future in futures.items():
+        # Catching generic Exception so that an error of one browser doesn't fail the others
+        if error := future.exception():
+            results[browser_name] = error
+        elif not _has_pending_changes(future.result().cookie_file):
+            browsers[browser_name] = future.result()
+
+    if not browsers:
+        return results
+
+    # Enables URI filenames in ATTACH statements
+    con = sqlite3.connect("file::memory:", uri=True)
+    try:
+        schemas = {}
+        for browser_name, browser in browsers.items():
+            schema = f"b{len(schemas)}"
+            uri = Path(browser.cookie_file).absolute().as_uri()
+            try:
+                con.execute(f"ATTACH DATABASE ? AS {schema}", (f"{uri}?mode=ro&immutable=1",))
+                con.execute(f"SELECT 1 FROM {schema}.sqlite_master")
+            except sqlite3.Error:
+                # e.g. not a database, left out to be read separately
+                try:
+                    con.execute(f"DETACH DATABASE {schema}")
+                except sqlite3.Error:
+                    pass
+                continue
+            schemas[browser_name] = schema
+        browsers = {name: browsers[name] for name in schemas}
+        con.execute("PRAGMA query_only = ON")
+
+        params = _build_params(domain_name, wanted)
+        chromium = [name for name in browsers if name in CHROMIUM_BASED]
+        firefox = [name for name in browsers if name in FIREFOX_BASED]
+        rows = {browser_name: [] for browser_name in browsers}
+        if chromium:
+            query = " UNION ALL ".join(
+                _build_select(
+                    f"{i} AS src, name, value, encrypted_value, host_key, path",
+                    f"{schemas[name]}.cookies",
+                    "host_key",
+                    wanted,
+                )
+                for i, name in enumerate(chromium)
+            )
+            for src, *row in con.execute(f"{query} ORDER BY src, host_key, path", params):
+                rows[chromium[src]].append(row)
+        if firefox:
+            query = " UNION ALL ".join(
+                _build_select(
+                    f"{i} AS src, name, value, host, path",
+                    f"{schemas[name]}.moz_cookies",
+                    "host",
+                    wanted,
+                )
+                for i, name in enumerate(firefox)
+            )
+            for src, *row in con.execute(f"{query} ORDER BY src, host, path", params):
+                rows[firefox[src]].append(row)
+
+        for browser_name, browser in browsers.items():
+            try:
+                if browser_name in FIREFOX_BASED:
+                    results[browser_name] = _merge_session_cookies(
+                        browser, rows[browser_name], wanted
+                    )
+                else:
+                    results[browser_name] = decrypt_cookies(
+                        browser,
+                        [row[:3] for row in rows[browser_name]],
+                        _has_integrity_check(con, schemas[browser_name]),
+                    )
+            except Exception as e:
+                results[browser_name] = e
+        return results
+    finally:
+        con.close()
@@ -2,7 +2,8 @@ import os
 import unittest
 import logging
 from pathlib import Path
-from unittest.mock import patch, MagicMock # Added MagicMock
+from types import MappingProxyType
+from unittest.mock import patch, AsyncMock, MagicMock # Added MagicMock
 
 from src.gemini_webapi.client import GeminiClient # Corrected import path
 from gemini_webapi import AuthError, set_log_level, logger # GeminiClient was imported from here before, changed to specific path
@@ -161,11 +162,12 @@ class TestGeminiClient(unittest.IsolatedAsyncioTestCase):
 
 
 # New Test Class for Cookie Loading
-MOCK_LOAD_BROWSER_COOKIES_PATH = "src.gemini_webapi.client.load_browser_cookies"
+MOCK_LOAD_BROWSER_COOKIES_PATH = "src.gemini_webapi.client.load_browser_cookies_async"
 MOCK_GET_ACCESS_TOKEN_PATH = "src.gemini_webapi.client.get_access_token"
+REQUIRED_KEYS = frozenset({"__Secure-1PSID", "__Secure-1PSIDTS"})
 
 
-class TestGeminiClientCookieLoading(unittest.TestCase):
+class TestGeminiClientCookieLoading(unittest.IsolatedAsyncioTestCase):
 
     def create_mock_cookies_data(self, psid_val="test_psid", psidts_val="test_psidts"):
         cookies = {}
@@ -175,69 +177,98 @@ class TestGeminiClientCookieLoading(unittest.TestCase):
             cookies["__Secure-1PSIDTS"] = psidts_val
         return cookies
 
-    @patch(MOCK_GET_ACCESS_TOKEN_PATH)
-    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH)
-    def test_init_with_explicit_cookies_no_browser_load(self, mock_load_cookies, mock_get_token):
-        mock_get_token.return_value = ("mock_token", self.create_mock_cookies_data())
+    async def init_client(self, client):
+        await client.init(auto_close=False, auto_refresh=False, verbose=False)
+        self.addAsyncCleanup(client.close)
+
+    @patch(MOCK_GET_ACCESS_TOKEN_PATH, new_callable=AsyncMock)
+    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH, new_callable=AsyncMock)
+    async def test_init_with_explicit_cookies_no_browser_load(self, mock_load_cookies, mock_get_token):
+        mock_get_token.return_value = ("mock_token", self.create_mock_cookies_data("explicit_psid", "explicit_psidts"))
 
         client = GeminiClient(secure_1psid="explicit_psid", secure_1psidts="explicit_psidts")
+        await self.init_client(client)
 
         mock_load_cookies.assert_not_called()
         self.assertEqual(client.cookies["__Secure-1PSID"], "explicit_psid")
 
-    @patch(MOCK_GET_ACCESS_TOKEN_PATH)
-    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH)
-    def test_init_auto_load_true_preferred_browser_set(self, mock_load_cookies, mock_get_token):
-        mock_load_cookies.return_value = self.create_mock_cookies_data("browser_psid")
+    @patch(MOCK_GET_ACCESS_TOKEN_PATH, new_callable=AsyncMock)
+    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH, new_callable=AsyncMock)
+    async def test_init_auto_load_true_preferred_browser_set(self, mock_load_cookies, mock_get_token):
+        mock_load_cookies.return_value = MappingProxyType(self.create_mock_cookies_data("browser_psid"))
         mock_get_token.return_value = ("mock_token", self.create_mock_cookies_data("browser_psid"))
 
         client = GeminiClient(preferred_browser="firefox")
+        # Cookies are loaded in init() rather than on construction
+        mock_load_cookies.assert_not_called()
+        await self.init_client(client)
 
-        mock_load_cookies.assert_called_once_with(domain_name="google.com", browser_name="firefox", verbose=True)
+        mock_load_cookies.assert_awaited_once_with(
+            domain_name="google.com", browser_name="firefox", verbose=True, required_keys=REQUIRED_KEYS
+        )
+        mock_get_token.assert_awaited_once_with(
+            base_cookies=self.create_mock_cookies_data("browser_psid"), proxy=None, verbose=False
+        )
         self.assertEqual(client.cookies["__Secure-1PSID"], "browser_psid")
 
-    @patch(MOCK_GET_ACCESS_TOKEN_PATH)
-    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH)
-    def test_init_auto_load_true_no_preferred_browser(self, mock_load_cookies, mock_get_token):
-        mock_load_cookies.return_value = self.create_mock_cookies_data("any_browser_psid")
+    @patch(MOCK_GET_ACCESS_TOKEN_PATH, new_callable=AsyncMock)
+    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH, new_callable=AsyncMock)
+    async def test_init_auto_load_true_no_preferred_browser(self, mock_load_cookies, mock_get_token):
+        mock_load_cookies.return_value = MappingProxyType(self.create_mock_cookies_data("any_browser_psid"))
         mock_get_token.return_value = ("mock_token", self.create_mock_cookies_data("any_browser_psid"))
 
         client = GeminiClient()
+        await self.init_client(client)
 
-        mock_load_cookies.assert_called_once_with(domain_name="google.com", browser_name=None, verbose=True)
+        mock_load_cookies.assert_awaited_once_with(
+            domain_name="google.com", browser_name=None, verbose=True, required_keys=REQUIRED_KEYS
+        )
         self.assertEqual(client.cookies["__Secure-1PSID"], "any_browser_psid")
 
-    @patch(MOCK_GET_ACCESS_TOKEN_PATH)
-    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH)
-    def test_init_auto_load_false(self, mock_load_cookies, mock_get_token):
-        mock_get_token.return_value = ("mock_token", {})
+    @patch(MOCK_GET_ACCESS_TOKEN_PATH, new_callable=AsyncMock)
+    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH, new_callable=AsyncMock)
+    async def test_init_auto_load_false(self, mock_load_cookies, mock_get_token):
+        mock_get_token.return_value = ("mock_token", self.create_mock_cookies_data())
 
         client = GeminiClient(auto_load_cookies=False)
+        await self.init_client(client)
 
         mock_load_cookies.assert_not_called()
-        self.assertEqual(client.cookies, {})
+        mock_get_token.assert_awaited_once_with(base_cookies={}, proxy=None, verbose=False)
 
-    @patch(MOCK_GET_ACCESS_TOKEN_PATH)
-    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH)
-    def test_init_auto_load_true_browser_load_fails_no_psid(self, mock_load_cookies, mock_get_token):
-        mock_load_cookies.return_value = {"OTHER_COOKIE": "some_val"}
-        mock_get_token.return_value = ("mock_token", {})
+    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH, new_callable=AsyncMock)
+    async def test_load_cookies_no_psid(self, mock_load_cookies):
+        mock_load_cookies.return_value = MappingProxyType({"OTHER_COOKIE": "some_val"})
 
         client = GeminiClient()
+        await client.load_cookies()
 
-        mock_load_cookies.assert_called_once_with(domain_name="google.com", browser_name=None, verbose=True)
+        mock_load_cookies.assert_awaited_once_with(
+            domain_name="google.com", browser_name=None, verbose=True, required_keys=REQUIRED_KEYS
+        )
         self.assertEqual(client.cookies, {})
 
-    @patch(MOCK_GET_ACCESS_TOKEN_PATH)
-    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH, side_effect=ImportError("browser-cookie3 not installed"))
-    def test_init_auto_load_true_browser_cookie3_not_installed(self, mock_load_cookies_import_error, mock_get_token):
-        mock_get_token.return_value = ("mock_token", {})
-
+    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH, new_callable=AsyncMock, side_effect=ImportError("browser-cookie3 not installed"))
+    async def test_load_cookies_browser_cookie3_not_installed(self, mock_load_cookies_import_error):
         client = GeminiClient(auto_load_cookies=True)
+        await client.load_cookies()
 
-        mock_load_cookies_import_error.assert_called_once_with(domain_name="google.com", browser_name=None, verbose=True)
+        mock_load_cookies_import_error.assert_awaited_once_with(
+            domain_name="google.com", browser_name=None, verbose=True, required_keys=REQUIRED_KEYS
+        )
         self.assertEqual(client.cookies, {})
 
+    @patch(MOCK_LOAD_BROWSER_COOKIES_PATH, new_callable=AsyncMock)
+    async def test_load_cookies_returns_mutable_copy(self, mock_load_cookies):
+        mock_load_cookies.return_value = MappingProxyType(self.create_mock_cookies_data("browser_psid"))
+
+        client = GeminiClient()
+        await client.load_cookies()
+
+        # Updated in place by the auto refresh task
+        client.cookies["__Secure-1PSIDTS"] = "rotated_psidts"
+        self.assertEqual(client.cookies["__Secure-1PSIDTS"], "rotated_psidts")
+
 
 if __name__ == "__main__":
     unittest.main()
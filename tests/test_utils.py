@@ -1,24 +1,98 @@
+import asyncio
+import functools
+import importlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 import browser_cookie3 # Import for type hinting and error types
 
 # Adjust the import path based on your project structure
-from src.gemini_webapi.utils.load_browser_cookies import load_browser_cookies, BROWSER_MAPPING
-from src.gemini_webapi.utils.logger import logger # To potentially check logs
+from src.gemini_webapi.utils.load_browser_cookies import load_browser_cookies, load_browser_cookies_async, reset_request_cache
+from src.gemini_webapi.utils.read_cookie_db import read_cookie_db, read_cookie_dbs
+from src.gemini_webapi.utils.decrypt_cookies import decrypt_cookies
+from src.gemini_webapi.utils.logger import logger, set_log_level # To potentially check logs
 
 # Disable logging for tests unless specifically testing log output
-logger.setLevel("CRITICAL")
+set_log_level("CRITICAL")
+
+# The module is shadowed by the function of the same name re-exported in `utils`
+load_browser_cookies_module = importlib.import_module("src.gemini_webapi.utils.load_browser_cookies")
+# Patched in tests by default, kept to test it directly
+installed = load_browser_cookies_module._installed
+BROWSER_MAPPING = load_browser_cookies_module._get_mapping()
+
+
+def patch_browser(browser_name):
+    """
+    Patch a browser entry of BROWSER_MAPPING with a MagicMock and pass it to the test.
+    Stacks like `unittest.mock.patch`, the bottom decorator provides the first mock argument.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args):
+            mock_fn = MagicMock()
+            with patch.dict(BROWSER_MAPPING, {browser_name: mock_fn}):
+                return func(self, mock_fn, *args)
+
+        return wrapper
+
+    return decorator
+
+
+def patch_all_browsers(func):
+    """
+    Patch every entry of BROWSER_MAPPING with a MagicMock at once and pass the mocks to the test
+    as a dict keyed by browser name.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        mocks = {browser_name: MagicMock() for browser_name in BROWSER_MAPPING}
+        with patch.dict(BROWSER_MAPPING, mocks):
+            return func(self, mocks, *args)
+
+    return wrapper
+
 
 class TestLoadBrowserCookies(unittest.TestCase):
 
-    def create_mock_cookie(self, name, value, domain):
+    @classmethod
+    def setUpClass(cls):
+        # Cookies used across tests are only read, so the same mocks are shared
+        cls.chrome_psid_cookie = cls.create_mock_cookie("__Secure-1PSID", "chrome_psid", "google.com")
+        cls.chrome_other_cookie = cls.create_mock_cookie("OTHER_COOKIE", "chrome_other_val", "google.com")
+        cls.firefox_psid_cookie = cls.create_mock_cookie("__Secure-1PSID", "firefox_psid", "google.com")
+
+    def setUp(self):
+        # Keep tests independent of browsers installed on the machine running them
+        patcher = patch.object(load_browser_cookies_module, '_get_cookie_files', return_value=[])
+        self.mock_get_cookie_files = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(load_browser_cookies_module, '_installed', return_value=True)
+        self.mock_installed = patcher.start()
+        self.addCleanup(patcher.stop)
+        load_browser_cookies_module._result_cache.clear()
+        load_browser_cookies_module._batch_results.clear()
+
+    @staticmethod
+    def create_mock_cookie(name, value, domain):
         mock_cookie = MagicMock()
         mock_cookie.name = name
         mock_cookie.value = value
         mock_cookie.domain = domain
         return mock_cookie
 
-    @patch('browser_cookie3.chrome')
+    @patch_browser('chrome')
     def test_load_specific_browser_chrome_success(self, mock_chrome):
         # Mock chrome to return a specific cookie
         mock_cookie = self.create_mock_cookie("__Secure-1PSID", "test_psid_val", "google.com")
@@ -28,7 +102,7 @@ class TestLoadBrowserCookies(unittest.TestCase):
         self.assertEqual(cookies, {"__Secure-1PSID": "test_psid_val"})
         mock_chrome.assert_called_once_with(domain_name="google.com")
 
-    @patch('browser_cookie3.firefox')
+    @patch_browser('firefox')
     def test_load_specific_browser_firefox_success(self, mock_firefox):
         mock_cookie = self.create_mock_cookie("__Secure-1PSID", "test_psid_val_ff", "google.com")
         mock_firefox.return_value = [mock_cookie]
@@ -37,7 +111,7 @@ class TestLoadBrowserCookies(unittest.TestCase):
         self.assertEqual(cookies, {"__Secure-1PSID": "test_psid_val_ff"})
         mock_firefox.assert_called_once_with(domain_name="google.com")
 
-    @patch('browser_cookie3.edge')
+    @patch_browser('edge')
     def test_load_specific_browser_edge_not_found(self, mock_edge):
         # Mock edge to return no cookies
         mock_edge.return_value = []
@@ -45,7 +119,7 @@ class TestLoadBrowserCookies(unittest.TestCase):
         self.assertEqual(cookies, {})
         mock_edge.assert_called_once_with(domain_name="google.com")
 
-    @patch('browser_cookie3.chrome')
+    @patch_browser('chrome')
     def test_load_specific_browser_chrome_error(self, mock_chrome):
         # Mock chrome to raise an error
         mock_chrome.side_effect = browser_cookie3.BrowserCookieError("Chrome error")
@@ -53,41 +127,73 @@ class TestLoadBrowserCookies(unittest.TestCase):
         self.assertEqual(cookies, {})
         mock_chrome.assert_called_once_with(domain_name="google.com")
 
+    @patch_all_browsers
+    def test_sync_call_in_event_loop_does_not_wait_for_async_load(self, mocks):
+        def slow_chrome(**kwargs):
+            time.sleep(0.2)
+            return [self.chrome_psid_cookie]
+
+        for mock_fn in mocks.values():
+            mock_fn.return_value = []
+        mocks["chrome"].side_effect = slow_chrome
+
+        async def main():
+            task = asyncio.create_task(load_browser_cookies_async(domain_name="google.com"))
+            await asyncio.sleep(0.05)
+            # Blocks the event loop running the in-flight async load with the same arguments
+            sync_cookies = load_browser_cookies(domain_name="google.com")
+            return sync_cookies, await task
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(asyncio.run(main())), daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive(), "Sync call deadlocked with the async load")
+        self.assertEqual(results, [({"__Secure-1PSID": "chrome_psid"}, {"__Secure-1PSID": "chrome_psid"})])
+        self.assertEqual(mocks["chrome"].call_count, 2)
+
+    @patch_browser('chrome')
+    def test_expired_results_are_pruned(self, mock_chrome):
+        mock_chrome.return_value = [self.chrome_psid_cookie]
+        with patch.object(load_browser_cookies_module.time, 'monotonic', return_value=100.0) as mock_monotonic:
+            load_browser_cookies(domain_name="google.com", browser_name="chrome")
+            mock_monotonic.return_value += load_browser_cookies_module._RESULT_CACHE_TTL
+            load_browser_cookies(domain_name="example.com", browser_name="chrome")
+        self.assertEqual(
+            [key[0] for key in load_browser_cookies_module._result_cache], ["example.com"]
+        )
+
+    @patch_browser('edge')
+    def test_load_browser_name_aliases(self, mock_edge):
+        mock_edge.return_value = [self.create_mock_cookie("__Secure-1PSID", "edge_psid", "google.com")]
+        for browser_name in ("EDGE", "msedge", "Microsoft Edge"):
+            cookies = load_browser_cookies(domain_name="google.com", browser_name=browser_name)
+            self.assertEqual(cookies, {"__Secure-1PSID": "edge_psid"})
+        # All spellings share the same recent result
+        mock_edge.assert_called_once_with(domain_name="google.com")
+
     def test_load_invalid_browser_name(self):
         browser_name = "nonexistentbrowser"
         expected_warning = (
-            f"Invalid browser name '{browser_name}'. Supported names are: {', '.join(BROWSER_MAPPING.keys())}. "
-            "No cookies will be loaded."
+            "Invalid browser name '{}'. Supported names are: {}. No cookies will be loaded.",
+            browser_name,
+            load_browser_cookies_module._SUPPORTED_BROWSER_NAMES,
         )
         with patch.object(logger, 'warning') as mock_log_warning:
             cookies = load_browser_cookies(domain_name="google.com", browser_name=browser_name)
             self.assertEqual(cookies, {})
-            mock_log_warning.assert_called_once_with(expected_warning)
-
-
-    @patch('browser_cookie3.librewolf')
-    @patch('browser_cookie3.safari')
-    @patch('browser_cookie3.vivaldi')
-    @patch('browser_cookie3.edge')
-    @patch('browser_cookie3.brave')
-    @patch('browser_cookie3.opera_gx')
-    @patch('browser_cookie3.opera')
-    @patch('browser_cookie3.chromium')
-    @patch('browser_cookie3.chrome')
-    @patch('browser_cookie3.firefox')
-    def test_load_no_specific_browser_tries_all_mapped(self, mock_firefox, mock_chrome, mock_chromium, mock_opera, mock_opera_gx, mock_brave, mock_edge, mock_vivaldi, mock_safari, mock_librewolf):
+            mock_log_warning.assert_called_once_with(*expected_warning)
+
+
+    @patch_all_browsers
+    def test_load_no_specific_browser_tries_all_mapped(self, mocks):
         # Mock one browser to return cookies, others to return empty or error
-        mock_ff_cookie = self.create_mock_cookie("__Secure-1PSID", "firefox_psid", "google.com")
-        mock_firefox.return_value = [mock_ff_cookie]
-        mock_chrome.return_value = []
-        mock_chromium.return_value = []
-        mock_opera.side_effect = browser_cookie3.BrowserCookieError("Opera error")
-        mock_opera_gx.return_value = []
-        mock_brave.return_value = []
-        mock_edge.side_effect = browser_cookie3.BrowserCookieError("Edge error")
-        mock_vivaldi.return_value = []
-        mock_safari.side_effect = browser_cookie3.BrowserCookieError("Safari error")
-        mock_librewolf.return_value = []
+        for mock_fn in mocks.values():
+            mock_fn.return_value = []
+        mocks["firefox"].return_value = [self.firefox_psid_cookie]
+        mocks["opera"].side_effect = browser_cookie3.BrowserCookieError("Opera error")
+        mocks["edge"].side_effect = browser_cookie3.BrowserCookieError("Edge error")
+        mocks["safari"].side_effect = browser_cookie3.BrowserCookieError("Safari error")
 
 
         # Expected cookies only from firefox
@@ -96,56 +202,81 @@ class TestLoadBrowserCookies(unittest.TestCase):
         cookies = load_browser_cookies(domain_name="google.com", browser_name=None, verbose=False)
         self.assertEqual(cookies, expected_cookies)
 
-        mock_firefox.assert_called_once_with(domain_name="google.com")
+        for mock_fn in mocks.values():
+            mock_fn.assert_called_once_with(domain_name="google.com")
+
+
+    @patch_browser('firefox')
+    @patch_browser('chrome')
+    def test_load_skips_browsers_not_installed(self, mock_chrome, mock_firefox):
+        mock_chrome.return_value = [self.chrome_psid_cookie]
+        self.mock_installed.side_effect = lambda name: name == "chrome"
+        cookies = load_browser_cookies(domain_name="google.com")
+        self.assertEqual(cookies, {"__Secure-1PSID": "chrome_psid"})
         mock_chrome.assert_called_once_with(domain_name="google.com")
-        mock_chromium.assert_called_once_with(domain_name="google.com")
-        mock_opera.assert_called_once_with(domain_name="google.com")
-        mock_opera_gx.assert_called_once_with(domain_name="google.com")
-        mock_brave.assert_called_once_with(domain_name="google.com")
-        mock_edge.assert_called_once_with(domain_name="google.com")
-        mock_vivaldi.assert_called_once_with(domain_name="google.com")
-        mock_safari.assert_called_once_with(domain_name="google.com")
-        mock_librewolf.assert_called_once_with(domain_name="google.com")
+        mock_firefox.assert_not_called()
+
+        # A specific browser is always tried
+        load_browser_cookies(domain_name="google.com", browser_name="firefox")
+        mock_firefox.assert_called_once_with(domain_name="google.com")
 
+    def test_installed_checks_data_directories(self):
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(load_browser_cookies_module, '_get_platform', return_value="linux"), \
+                patch.object(load_browser_cookies_module, '_installed_browsers', set()), \
+                patch.dict(load_browser_cookies_module._COOKIE_FILE_PATTERNS, {"linux": {
+                    "firefox": [f"{temp_dir}/firefox/*/cookies.sqlite"],
+                    "opera": [f"{temp_dir}/opera*/Cookies"],
+                }}):
+            self.assertFalse(installed("firefox"))
+            self.assertFalse(installed("opera"))
+            self.assertFalse(installed("safari"))
 
-    @patch('browser_cookie3.chrome')
+            # Profiles of Firefox may be anywhere, but profiles.ini is in its data directory
+            os.makedirs(f"{temp_dir}/firefox")
+            Path(f"{temp_dir}/firefox/profiles.ini").touch()
+            os.makedirs(f"{temp_dir}/opera-beta")
+            self.assertTrue(installed("firefox"))
+            self.assertTrue(installed("opera"))
+
+            # Positive results are kept
+            shutil.rmtree(f"{temp_dir}/firefox")
+            self.assertTrue(installed("firefox"))
+
+    def test_installed_checks_chrome_group_policy_directory(self):
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(load_browser_cookies_module, '_get_platform', return_value="win32"), \
+                patch.object(load_browser_cookies_module, '_installed_browsers', set()), \
+                patch.object(browser_cookie3, '_windows_group_policy_path',
+                             return_value=f"{temp_dir}/User Data/Default/Cookies"):
+            self.assertFalse(installed("chrome"))
+
+            os.makedirs(f"{temp_dir}/User Data/Default")
+            self.assertTrue(installed("chrome"))
+
+    @patch_browser('chrome')
     def test_permission_error_handling(self, mock_chrome):
-        mock_chrome.side_effect = PermissionError("Permission denied for Chrome")
+        error = PermissionError("Permission denied for Chrome")
+        mock_chrome.side_effect = error
         with patch.object(logger, 'warning') as mock_log_warning:
             cookies = load_browser_cookies(domain_name="google.com", browser_name="chrome", verbose=True) # verbose=True to check log
             self.assertEqual(cookies, {})
-            # The warning message includes the browser name from the mapping key, which is lowercased.
-            mock_log_warning.assert_called_with("Permission denied while trying to load cookies from chrome. Permission denied for Chrome")
-
-    @patch('browser_cookie3.librewolf')
-    @patch('browser_cookie3.safari')
-    @patch('browser_cookie3.vivaldi')
-    @patch('browser_cookie3.edge')
-    @patch('browser_cookie3.brave')
-    @patch('browser_cookie3.opera_gx')
-    @patch('browser_cookie3.opera')
-    @patch('browser_cookie3.chromium')
-    @patch('browser_cookie3.chrome')
-    @patch('browser_cookie3.firefox')
-    def test_load_no_specific_browser_merges_cookies(self, mock_firefox, mock_chrome, mock_chromium, mock_opera, mock_opera_gx, mock_brave, mock_edge, mock_vivaldi, mock_safari, mock_librewolf):
-        mock_chrome_psid = self.create_mock_cookie("__Secure-1PSID", "chrome_psid", "google.com")
-        mock_chrome_other = self.create_mock_cookie("OTHER_COOKIE", "chrome_other_val", "google.com")
-        mock_chrome.return_value = [mock_chrome_psid, mock_chrome_other]
+            # The message is formatted by loguru only if the record is emitted
+            mock_log_warning.assert_called_with("Permission denied while trying to load cookies from {}. {}", "chrome", error)
+
+    @patch_all_browsers
+    def test_load_no_specific_browser_merges_cookies(self, mocks):
+        for mock_fn in mocks.values():
+            mock_fn.return_value = []
+        mocks["chrome"].return_value = [self.chrome_psid_cookie, self.chrome_other_cookie]
 
         mock_ff_another = self.create_mock_cookie("ANOTHER_COOKIE", "firefox_another_val", "google.com")
         # Test override: firefox has a different value for __Secure-1PSID
         mock_ff_psid_override = self.create_mock_cookie("__Secure-1PSID", "firefox_override_psid", "google.com")
-        mock_firefox.return_value = [mock_ff_another, mock_ff_psid_override]
-
+        mocks["firefox"].return_value = [mock_ff_another, mock_ff_psid_override]
 
-        mock_chromium.return_value = []
-        mock_opera.side_effect = browser_cookie3.BrowserCookieError("Opera error")
-        mock_opera_gx.return_value = []
-        mock_brave.return_value = []
-        mock_edge.return_value = []
-        mock_vivaldi.return_value = []
-        mock_safari.side_effect = browser_cookie3.BrowserCookieError("Safari error")
-        mock_librewolf.return_value = []
+        mocks["opera"].side_effect = browser_cookie3.BrowserCookieError("Opera error")
+        mocks["safari"].side_effect = browser_cookie3.BrowserCookieError("Safari error")
 
 
         # Cookies from Chrome and Firefox should be merged.
@@ -170,16 +301,435 @@ class TestLoadBrowserCookies(unittest.TestCase):
         self.assertEqual(cookies, expected_cookies)
 
         # Assert all mocks were called
-        mock_firefox.assert_called_once_with(domain_name="google.com")
+        for mock_fn in mocks.values():
+            mock_fn.assert_called_once_with(domain_name="google.com")
+
+    @patch_browser('chrome')
+    def test_load_cookie_name_filter(self, mock_chrome):
+        mock_chrome.return_value = [
+            self.chrome_psid_cookie,
+            self.create_mock_cookie("NID", "chrome_nid", "google.com"),
+            self.chrome_other_cookie,
+        ]
+        cookies = load_browser_cookies(
+            domain_name="google.com",
+            browser_name="chrome",
+            required_keys=frozenset({"__Secure-1PSID"}),
+            cookie_name_filter=frozenset({"__Secure-1PSID", "NID"}),
+        )
+        self.assertEqual(cookies, {"__Secure-1PSID": "chrome_psid", "NID": "chrome_nid"})
+
+    def test_load_required_keys_stops_at_first_complete_browser(self):
+        mocks = {name: MagicMock(return_value=[]) for name in BROWSER_MAPPING}
+        mocks["firefox"].return_value = [
+            self.firefox_psid_cookie,
+            self.create_mock_cookie("__Secure-1PSIDTS", "firefox_psidts", "google.com"),
+            self.create_mock_cookie("OTHER_COOKIE", "firefox_other_val", "google.com"),
+        ]
+        mocks["chrome"].return_value = [self.chrome_psid_cookie]
+
+        with patch.dict(BROWSER_MAPPING, mocks):
+            cookies = load_browser_cookies(
+                domain_name="google.com",
+                verbose=False,
+                required_keys=frozenset({"__Secure-1PSID", "__Secure-1PSIDTS"}),
+            )
+        # Firefox comes first in BROWSER_MAPPING and already has both cookies, chrome's value is not merged
+        self.assertEqual(cookies, {"__Secure-1PSID": "firefox_psid", "__Secure-1PSIDTS": "firefox_psidts"})
+
+    def test_load_async_merges_in_mapping_order(self):
+        mocks = {name: MagicMock(return_value=[]) for name in BROWSER_MAPPING}
+        mocks["firefox"].return_value = [self.firefox_psid_cookie]
+        mocks["chrome"].return_value = [self.chrome_psid_cookie]
+        mocks["safari"].side_effect = browser_cookie3.BrowserCookieError("Safari error")
+
+        with patch.dict(BROWSER_MAPPING, mocks):
+            cookies = asyncio.run(load_browser_cookies_async(domain_name="google.com", verbose=False))
+            self.assertEqual(cookies, {"__Secure-1PSID": "chrome_psid"})
+
+            cookies = asyncio.run(load_browser_cookies_async(domain_name="google.com", browser_name="firefox"))
+            self.assertEqual(cookies, {"__Secure-1PSID": "firefox_psid"})
+
+    def test_browser_mapping_is_built_on_first_access(self):
+        self.assertIs(load_browser_cookies_module.BROWSER_MAPPING, BROWSER_MAPPING)
+        self.assertEqual(tuple(BROWSER_MAPPING), load_browser_cookies_module._BROWSER_NAMES)
+        self.assertIs(load_browser_cookies_module.__dict__["BROWSER_MAPPING"], BROWSER_MAPPING)
+
+    def test_load_browser_cookie3_not_installed(self):
+        with patch.dict(sys.modules, {"browser_cookie3": None}), \
+                patch.object(load_browser_cookies_module, '_BROWSER_MAPPING', None), \
+                patch.object(load_browser_cookies_module, '_RESULT_CACHE_TTL', 0), \
+                patch.object(logger, 'warning') as mock_log_warning:
+            cookies = load_browser_cookies(domain_name="google.com")
+            self.assertEqual(cookies, {})
+            cookies = asyncio.run(load_browser_cookies_async(domain_name="google.com"))
+            self.assertEqual(cookies, {})
+            self.assertEqual(mock_log_warning.call_count, 2)
+
+    @patch_browser('firefox')
+    def test_load_reads_cookie_database_directly(self, mock_firefox):
+        self.mock_get_cookie_files.return_value = ["cookies.sqlite"]
+        with patch.object(load_browser_cookies_module, 'read_cookie_db') as mock_read_cookie_db, \
+                patch.object(load_browser_cookies_module, '_RESULT_CACHE_TTL', 0), \
+                patch.dict(os.environ, {"GEMINI_COOKIE_CACHE": "0"}):
+            mock_read_cookie_db.return_value = {"__Secure-1PSID": "firefox_psid"}
+            cookies = load_browser_cookies(domain_name="google.com", browser_name="firefox")
+            self.assertEqual(cookies, {"__Secure-1PSID": "firefox_psid"})
+            mock_firefox.assert_not_called()
+
+            # Falls back to browser_cookie3 if the database cannot be read directly
+            mock_read_cookie_db.side_effect = sqlite3.OperationalError("database is locked")
+            mock_firefox.return_value = [self.firefox_psid_cookie]
+            cookies = load_browser_cookies(domain_name="google.com", browser_name="firefox")
+            self.assertEqual(cookies, {"__Secure-1PSID": "firefox_psid"})
+            mock_firefox.assert_called_once_with(domain_name="google.com")
+
+    def test_read_cookie_db_firefox(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cookie_file = os.path.join(temp_dir, "cookies.sqlite")
+            con = sqlite3.connect(cookie_file)
+            con.execute("PRAGMA journal_mode = WAL")
+            con.execute("CREATE TABLE moz_cookies (name TEXT, value TEXT, host TEXT, path TEXT)")
+            con.executemany(
+                "INSERT INTO moz_cookies VALUES (?, ?, ?, ?)",
+                [
+                    ("__Secure-1PSID", "psid", ".google.com", "/"),
+                    ("NID", "gemini_nid", "gemini.google.com", "/"),
+                    ("NID", "google_nid", ".google.com", "/"),
+                    ("OTHER_COOKIE", "other_val", ".google.com", "/"),
+                    ("__Secure-1PSID", "example_psid", ".example.com", "/"),
+                ],
+            )
+            con.commit()
+
+            with patch('browser_cookie3.Firefox') as mock_firefox_class:
+                mock_firefox_class.return_value.cookie_file = cookie_file
+                # Like a running Firefox, the writer keeps the changes in WAL without checkpointing
+                self.assertTrue(os.path.getsize(f"{cookie_file}-wal"))
+                cookies = read_cookie_db("firefox", "google.com", frozenset({"__Secure-1PSID", "NID"}))
+                self.assertEqual(cookies, {"__Secure-1PSID": "psid", "NID": "gemini_nid"})
+
+                # Without pending WAL changes, the database file is read as immutable
+                con.close()
+                self.assertFalse(os.path.exists(f"{cookie_file}-wal"))
+                cookies = read_cookie_db("firefox", "google.com", frozenset({"__Secure-1PSID", "NID"}))
+
+        # Same as cookiejar iteration order, the cookie of the host sorted last wins
+        self.assertEqual(cookies, {"__Secure-1PSID": "psid", "NID": "gemini_nid"})
+
+    def test_read_cookie_db_firefox_merges_session_cookies(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cookie_file = os.path.join(temp_dir, "cookies.sqlite")
+            con = sqlite3.connect(cookie_file)
+            con.execute(
+                "CREATE TABLE moz_cookies (name TEXT, value TEXT, host TEXT, path TEXT, isSecure INTEGER, expiry INTEGER, isHttpOnly INTEGER)"
+            )
+            con.executemany(
+                "INSERT INTO moz_cookies VALUES (?, ?, ?, '/', 1, 0, 1)",
+                [("__Secure-1PSID", "db_psid", ".google.com"), ("NID", "db_nid", "gemini.google.com")],
+            )
+            con.commit()
+            con.close()
+            with open(os.path.join(temp_dir, "sessionstore.js"), "w") as f:
+                json.dump(
+                    {"windows": [{"cookies": [
+                        {"host": ".google.com", "path": "/", "name": "__Secure-1PSID", "value": "session_psid"},
+                        {"host": ".google.com", "path": "/", "name": "NID", "value": "session_nid"},
+                        {"host": ".google.com", "path": "/", "name": "SESSION_ONLY", "value": "session_val"},
+                        {"host": ".example.com", "path": "/", "name": "SESSION_ONLY", "value": "example_val"},
+                    ]}]},
+                    f,
+                )
+
+            browser = object.__new__(browser_cookie3.Firefox)
+            browser.browser_name = "Firefox"
+            browser.domain_name = "google.com"
+            browser.cookie_file = cookie_file
+            browser.session_file = os.path.join(temp_dir, "sessionstore.js")
+            browser.session_file_lz4 = os.path.join(temp_dir, "recovery.jsonlz4")
+            with patch('browser_cookie3.Firefox', return_value=browser):
+                cookies = read_cookie_db("firefox", "google.com")
+                filtered = read_cookie_db("firefox", "google.com", frozenset({"__Secure-1PSID", "SESSION_ONLY"}))
+            expected = {cookie.name: cookie.value for cookie in browser.load()}
+
+        self.assertEqual(cookies, expected)
+        self.assertEqual(cookies, {"__Secure-1PSID": "session_psid", "NID": "db_nid", "SESSION_ONLY": "session_val"})
+        self.assertEqual(filtered, {"__Secure-1PSID": "session_psid", "SESSION_ONLY": "session_val"})
+
+    def test_read_cookie_dbs_attaches_databases(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            chrome_file = os.path.join(temp_dir, "Cookies")
+            con = sqlite3.connect(chrome_file)
+            con.execute("CREATE TABLE meta (key TEXT, value TEXT)")
+            con.execute("INSERT INTO meta VALUES ('version', '24')")
+            con.execute("CREATE TABLE cookies (name TEXT, value TEXT, encrypted_value BLOB, host_key TEXT, path TEXT)")
+            con.executemany(
+                "INSERT INTO cookies VALUES (?, ?, ?, ?, ?)",
+                [
+                    ("__Secure-1PSID", "", b"chrome_psid", ".google.com", "/"),
+                    ("OTHER_COOKIE", "chrome_other_val", b"", ".google.com", "/"),
+                ],
+            )
+            con.commit()
+            con.close()
+
+            firefox_file = os.path.join(temp_dir, "cookies.sqlite")
+            con = sqlite3.connect(firefox_file)
+            con.execute("CREATE TABLE moz_cookies (name TEXT, value TEXT, host TEXT, path TEXT)")
+            con.execute("INSERT INTO moz_cookies VALUES ('__Secure-1PSID', 'firefox_psid', '.google.com', '/')")
+            con.commit()
+            con.close()
+
+            # Pending changes in WAL cannot be seen through an immutable database
+            librewolf_file = os.path.join(temp_dir, "librewolf.sqlite")
+            librewolf_con = sqlite3.connect(librewolf_file)
+            librewolf_con.execute("PRAGMA journal_mode = WAL")
+            librewolf_con.execute("CREATE TABLE moz_cookies (name TEXT, value TEXT, host TEXT, path TEXT)")
+            librewolf_con.commit()
+
+            # Same for a transaction in progress in the rollback journal
+            opera_file = os.path.join(temp_dir, "Opera Cookies")
+            shutil.copy(chrome_file, opera_file)
+            with open(f"{opera_file}-journal", "wb") as f:
+                f.write(b"\xd9\xd5\x05\xf9\x20\xa1\x63\xd7" + bytes(504))
+
+            not_a_database = os.path.join(temp_dir, "Edge Cookies")
+            with open(not_a_database, "w") as f:
+                f.write("not a database" * 100)
+
+            with patch('browser_cookie3.Chrome') as mock_chrome_class, \
+                    patch('browser_cookie3.Opera') as mock_opera_class, \
+                    patch('browser_cookie3.Edge') as mock_edge_class, \
+                    patch('browser_cookie3.Vivaldi', side_effect=RuntimeError("Keyring error")), \
+                    patch('browser_cookie3.Firefox') as mock_firefox_class, \
+                    patch('browser_cookie3.LibreWolf') as mock_librewolf_class, \
+                    patch('browser_cookie3.Brave', side_effect=browser_cookie3.BrowserCookieError("Brave error")):
+                mock_chrome_class.return_value.cookie_file = chrome_file
+                mock_chrome_class.return_value._decrypt.side_effect = lambda value, encrypted_value, has_integrity_check: (
+                    value or f"{encrypted_value.decode()}:{has_integrity_check}"
+                )
+                mock_firefox_class.return_value.cookie_file = firefox_file
+                mock_librewolf_class.return_value.cookie_file = librewolf_file
+                mock_opera_class.return_value.cookie_file = opera_file
+                mock_edge_class.return_value.cookie_file = not_a_database
+                results = read_cookie_dbs(
+                    ("firefox", "chrome", "opera", "brave", "librewolf", "edge", "vivaldi"), "google.com", frozenset({"__Secure-1PSID"})
+                )
+            librewolf_con.close()
+
+        self.assertEqual(results.pop("chrome"), {"__Secure-1PSID": "chrome_psid:True"})
+        self.assertEqual(results.pop("firefox"), {"__Secure-1PSID": "firefox_psid"})
+        self.assertIsInstance(results.pop("brave"), browser_cookie3.BrowserCookieError)
+        self.assertIsInstance(results.pop("vivaldi"), RuntimeError)
+        # Databases with pending WAL or journal changes, or which cannot be attached are left out
+        self.assertEqual(results, {})
+
+    @unittest.skipIf(sys.platform == "win32", "Cookies are encrypted with DPAPI/AES-GCM on Windows")
+    def test_decrypt_cookies_matches_browser_cookie3(self):
+        from Cryptodome.Cipher import AES
+        from Cryptodome.Util.Padding import pad
+
+        browser = object.__new__(browser_cookie3.Chrome)
+        browser.iv = b" " * 16
+        browser.v10_key, browser.v11_key, browser.v11_empty_key = b"k" * 16, b"l" * 16, b"m" * 16
+
+        def encrypt(version, key, plaintext):
+            return version + AES.new(key, AES.MODE_CBC, browser.iv).encrypt(pad(b"d" * 32 + plaintext, 16))
+
+        rows = [
+            ("__Secure-1PSID", "", encrypt(b"v10", browser.v10_key, b"psid" * 10)),
+            ("__Secure-1PSIDTS", "", encrypt(b"v11", browser.v11_key, b"psidts")),
+            ("NID", "", encrypt(b"v11", browser.v11_empty_key, b"nid")),  # Falls back to browser_cookie3
+            ("OTHER_COOKIE", "other_val", b""),
+            ("__Secure-1PSID", "", encrypt(b"v10", browser.v10_key, b"")),
+        ]
+        expected = {name: browser._decrypt(value, encrypted_value, True) for name, value, encrypted_value in rows}
+        self.assertEqual(decrypt_cookies(browser, rows, True), expected)
+        self.assertEqual(
+            expected, {"__Secure-1PSID": "", "__Secure-1PSIDTS": "psidts", "NID": "nid", "OTHER_COOKIE": "other_val"}
+        )
+
+    @patch_all_browsers
+    def test_load_reads_cookie_databases_in_batch(self, mocks):
+        for mock_fn in mocks.values():
+            mock_fn.return_value = []
+        self.mock_get_cookie_files.side_effect = lambda name: ["Cookies"] if name in ("firefox", "chrome", "edge") else []
+        with patch.object(load_browser_cookies_module, 'read_cookie_dbs') as mock_read_cookie_dbs, \
+                patch.object(load_browser_cookies_module, 'read_cookie_db', side_effect=sqlite3.OperationalError("database is locked")), \
+                patch.object(load_browser_cookies_module, '_RESULT_CACHE_TTL', 0), \
+                patch.dict(os.environ, {"GEMINI_COOKIE_CACHE": "0"}):
+            # Edge has pending changes in WAL, so it's left out and loaded separately
+            mock_read_cookie_dbs.return_value = {
+                "firefox": {"__Secure-1PSID": "firefox_psid"},
+                "chrome": {"__Secure-1PSID": "chrome_psid"},
+            }
+            mocks["edge"].return_value = [self.create_mock_cookie("NID", "edge_nid", "google.com")]
+            cookies = load_browser_cookies(domain_name="google.com", verbose=False)
+            self.assertEqual(cookies, {"__Secure-1PSID": "chrome_psid", "NID": "edge_nid"})
+
+            # An error of one browser is only logged
+            mock_read_cookie_dbs.return_value = {
+                "firefox": {"__Secure-1PSID": "firefox_psid"},
+                "chrome": RuntimeError("Failed to decrypt the cipher text with DPAPI"),
+            }
+            with patch.object(logger, 'error') as mock_log_error:
+                cookies = load_browser_cookies(domain_name="google.com")
+            self.assertEqual(cookies, {"__Secure-1PSID": "firefox_psid", "NID": "edge_nid"})
+            mock_log_error.assert_called_once_with(
+                "Error happened while trying to load cookies from {}. {}", "chrome", mock_read_cookie_dbs.return_value["chrome"]
+            )
+            mock_read_cookie_dbs.assert_called_with(("firefox", "chrome", "edge"), "google.com", frozenset())
+            mocks["firefox"].assert_not_called()
+            mocks["chrome"].assert_not_called()
+            self.assertEqual(mocks["edge"].call_count, 2)
+            self.assertEqual(mocks["safari"].call_count, 2)
+
+            # Falls back to loading browsers one by one if the batch query fails
+            mock_read_cookie_dbs.side_effect = sqlite3.OperationalError("too many attached databases")
+            mocks["firefox"].return_value = [self.firefox_psid_cookie]
+            cookies = asyncio.run(load_browser_cookies_async(domain_name="google.com", verbose=False))
+            self.assertEqual(cookies, {"__Secure-1PSID": "firefox_psid", "NID": "edge_nid"})
+            mocks["firefox"].assert_called_once_with(domain_name="google.com")
+            mocks["chrome"].assert_called_once_with(domain_name="google.com")
+
+    @patch_browser('chrome')
+    def test_unfiltered_batch_results_are_memoized_in_process(self, mocks):
+        for mock_fn in mocks.values():
+            mock_fn.return_value = []
+        self.mock_get_cookie_files.side_effect = lambda name: ["Cookies"] if name == "chrome" else []
+        stamp = (("Cookies", 1, 1),)
+        with patch.object(load_browser_cookies_module, 'read_cookie_dbs',
+                          return_value={"chrome": {"__Secure-1PSID": "chrome_psid"}}) as mock_read_cookie_dbs, \
+                patch.object(load_browser_cookies_module, '_get_cookie_files_stamp', side_effect=lambda name: stamp), \
+                patch.object(load_browser_cookies_module, '_write_cache_entries') as mock_write_cache_entries, \
+                patch.object(load_browser_cookies_module, '_RESULT_CACHE_TTL', 0), \
+                patch.dict(os.environ, {"GEMINI_COOKIE_CACHE": "1"}):
+            for _ in range(2):
+                cookies = load_browser_cookies(domain_name="google.com", verbose=False)
+                self.assertEqual(cookies, {"__Secure-1PSID": "chrome_psid"})
+            mock_read_cookie_dbs.assert_called_once()
+
+            # Read again once cookie files change
+            stamp = (("Cookies", 2, 1),)
+            load_browser_cookies(domain_name="google.com", verbose=False)
+            self.assertEqual(mock_read_cookie_dbs.call_count, 2)
+
+            # Unfiltered results never go to cache file
+            mock_write_cache_entries.assert_not_called()
+
+    @patch_browser('chrome')
+    def test_recent_result_is_shared_within_ttl(self, mock_chrome):
+        mock_chrome.return_value = [self.chrome_psid_cookie]
+        with patch.object(load_browser_cookies_module.time, 'monotonic', return_value=100.0) as mock_monotonic:
+            cookies = load_browser_cookies(domain_name="google.com", browser_name="chrome")
+            with self.assertRaises(TypeError):
+                cookies["__Secure-1PSID"] = "modified"  # Shared result is read-only
+            cookies = asyncio.run(load_browser_cookies_async(domain_name="google.com", browser_name="chrome"))
+            self.assertEqual(cookies, {"__Secure-1PSID": "chrome_psid"})
+            mock_chrome.assert_called_once_with(domain_name="google.com")
+
+            mock_monotonic.return_value += load_browser_cookies_module._RESULT_CACHE_TTL
+            load_browser_cookies(domain_name="google.com", browser_name="chrome")
+            self.assertEqual(mock_chrome.call_count, 2)
+
+    @patch_browser('chrome')
+    def test_request_cache_is_scoped_to_context(self, mock_chrome):
+        mock_chrome.return_value = [self.chrome_psid_cookie]
+
+        async def handle_request():
+            reset_request_cache()
+            first = await load_browser_cookies_async(domain_name="google.com", browser_name="chrome")
+            second = await load_browser_cookies_async(domain_name="google.com", browser_name="chrome")
+            self.assertIs(first, second)
+
+        async def serve():
+            # Each request runs in its own task, hence its own context
+            for _ in range(2):
+                await asyncio.create_task(handle_request())
+
+        with patch.object(load_browser_cookies_module, '_RESULT_CACHE_TTL', 0):
+            asyncio.run(serve())
+            self.assertEqual(mock_chrome.call_count, 2)
+
+            # No request cache outside of a request
+            load_browser_cookies(domain_name="google.com", browser_name="chrome")
+            self.assertEqual(mock_chrome.call_count, 3)
+
+    @patch_browser('chrome')
+    def test_cache_reuses_result_until_cookie_files_change(self, mock_chrome):
+        mock_chrome.return_value = [self.chrome_psid_cookie, self.chrome_other_cookie]
+        load_browser_cookies_module._extract_cookies.cache_clear()
+        load = functools.partial(
+            load_browser_cookies_module._cached_extract, "chrome", mock_chrome, "google.com", frozenset({"__Secure-1PSID"})
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(load_browser_cookies_module, '_CACHE_FILE', Path(temp_dir) / "cache.json"), \
+                patch.object(load_browser_cookies_module, '_get_cookie_files_stamp') as mock_stamp, \
+                patch.object(load_browser_cookies_module, '_RESULT_CACHE_TTL', 0), \
+                patch.dict(os.environ, {"GEMINI_COOKIE_CACHE": "1"}):
+            mock_stamp.return_value = (("Cookies", 1),)
+            for _ in range(2):
+                cookies = load()
+                self.assertEqual(cookies, {"__Secure-1PSID": "chrome_psid"})
+            mock_chrome.assert_called_once_with(domain_name="google.com")
+
+            # A new process only has the cache file to rely on
+            load_browser_cookies_module._extract_cookies.cache_clear()
+            load()
+            mock_chrome.assert_called_once_with(domain_name="google.com")
+
+            # Browser wrote to its cookie database since last extraction
+            mock_stamp.return_value = (("Cookies", 2),)
+            load()
+            self.assertEqual(mock_chrome.call_count, 2)
+
+            with patch.dict(os.environ, {"GEMINI_COOKIE_CACHE": "0"}):
+                load()
+                self.assertEqual(mock_chrome.call_count, 3)
+
+            # Unfiltered results are only memoized in process, never written to disk
+            for _ in range(2):
+                cookies = load_browser_cookies(domain_name="google.com", browser_name="chrome")
+                self.assertEqual(cookies, {"__Secure-1PSID": "chrome_psid", "OTHER_COOKIE": "chrome_other_val"})
+            self.assertEqual(mock_chrome.call_count, 4)
+            cache = json.loads((Path(temp_dir) / "cache.json").read_text())
+            self.assertEqual(list(cache), ["chrome:google.com:__Secure-1PSID"])
+            self.assertEqual(cache["chrome:google.com:__Secure-1PSID"]["cookies"], {"__Secure-1PSID": "chrome_psid"})
+
+    def test_cookie_files_stamp_includes_firefox_session_store(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cookie_file = os.path.join(temp_dir, "cookies.sqlite")
+            Path(cookie_file).touch()
+            self.mock_get_cookie_files.return_value = [cookie_file]
+            stamp = load_browser_cookies_module._get_cookie_files_stamp("firefox")
+            self.assertEqual(stamp, load_browser_cookies_module._get_cookie_files_stamp("chrome"))
+
+            # Session cookies changed without a write to the database
+            os.makedirs(os.path.join(temp_dir, "sessionstore-backups"))
+            Path(temp_dir, "sessionstore-backups", "recovery.jsonlz4").touch()
+            self.assertNotEqual(load_browser_cookies_module._get_cookie_files_stamp("firefox"), stamp)
+            self.assertEqual(load_browser_cookies_module._get_cookie_files_stamp("chrome"), stamp)
+
+    @patch_browser('chrome')
+    def test_concurrent_calls_share_one_load(self, mock_chrome):
+        def slow_chrome(**kwargs):
+            time.sleep(0.2)
+            return [self.chrome_psid_cookie]
+
+        mock_chrome.side_effect = slow_chrome
+        with patch.object(load_browser_cookies_module, '_RESULT_CACHE_TTL', 0), \
+                patch.dict(os.environ, {"GEMINI_COOKIE_CACHE": "0"}), \
+                ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(load_browser_cookies, domain_name="google.com", browser_name="chrome")
+                for _ in range(4)
+            ]
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, [{"__Secure-1PSID": "chrome_psid"}] * 4)
         mock_chrome.assert_called_once_with(domain_name="google.com")
-        mock_chromium.assert_called_once_with(domain_name="google.com")
-        mock_opera.assert_called_once_with(domain_name="google.com")
-        mock_opera_gx.assert_called_once_with(domain_name="google.com")
-        mock_brave.assert_called_once_with(domain_name="google.com")
-        mock_edge.assert_called_once_with(domain_name="google.com")
-        mock_vivaldi.assert_called_once_with(domain_name="google.com")
-        mock_safari.assert_called_once_with(domain_name="google.com")
-        mock_librewolf.assert_called_once_with(domain_name="google.com")
+        self.assertFalse(load_browser_cookies_module._pending_loads)
 
 if __name__ == '__main__':
     unittest.main()